@@ -0,0 +1,100 @@
+import bisect
+import threading
+from datetime import date
+
+
+class EntryStats:
+    """
+    Contadores de /api/stats mantidos pelo EntryStore a cada escrita,
+    para que a rota não precise percorrer as entradas.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset([])
+
+    # --- Manutenção (chamado pelo store) ---
+
+    def reset(self, entries):
+        with self._lock:
+            self._total_entries = 0
+            self._total_words = 0
+            self._completed = 0
+            self._years = {}
+            self._months = {}
+            self._categories = {}
+            self._priorities = {}
+            self._pending_due = []  # dueDates ordenados das tarefas pendentes
+            for entry in entries:
+                self._count(entry, 1, sorted_insert=False)
+            self._pending_due.sort()
+
+    def apply(self, old, new):
+        with self._lock:
+            if old is not None:
+                self._count(old, -1)
+            if new is not None:
+                self._count(new, 1)
+
+    @staticmethod
+    def _bump(counters, key, field, delta):
+        bucket = counters.setdefault(key, {})
+        bucket[field] = bucket.get(field, 0) + delta
+
+    @staticmethod
+    def _prune(counters, key, field):
+        if counters.get(key, {}).get(field) == 0:
+            del counters[key]
+
+    def _count(self, entry, sign, sorted_insert=True):
+        words = len((entry.get('content') or '').split())
+        completed = bool(entry.get('completed', False))
+        entry_date = entry.get('date') or ''
+        year, month = entry_date[:4], entry_date[:7]  # Assume formato YYYY-MM-DD
+        category = entry.get('category') or 'personal'
+        priority = entry.get('priority') or 'medium'
+
+        self._total_entries += sign
+        self._total_words += sign * words
+        self._completed += sign if completed else 0
+
+        for counters, key in ((self._years, year), (self._months, month)):
+            self._bump(counters, key, 'entries', sign)
+            self._bump(counters, key, 'words', sign * words)
+            self._prune(counters, key, 'entries')
+        self._bump(self._categories, category, 'entries', sign)
+        self._bump(self._categories, category, 'completed', sign if completed else 0)
+        self._prune(self._categories, category, 'entries')
+        self._priorities[priority] = self._priorities.get(priority, 0) + sign
+        if self._priorities[priority] == 0:
+            del self._priorities[priority]
+
+        due = entry.get('dueDate') or ''
+        if due and not completed:
+            if sign > 0 and not sorted_insert:
+                self._pending_due.append(due)
+            elif sign > 0:
+                bisect.insort(self._pending_due, due)
+            else:
+                i = bisect.bisect_left(self._pending_due, due)
+                if i < len(self._pending_due) and self._pending_due[i] == due:
+                    del self._pending_due[i]
+
+    # --- Consulta ---
+
+    def snapshot(self, today=None):
+        """Retorna as estatísticas no formato da rota /api/stats"""
+        today = today or date.today().isoformat()
+        with self._lock:
+            return {
+                'total_entries': self._total_entries,
+                'total_words': self._total_words,
+                'years': {key: dict(value) for key, value in self._years.items()},
+                'months': {key: dict(value) for key, value in self._months.items()},
+                'categories': {key: dict(value) for key, value in self._categories.items()},
+                'priorities': dict(self._priorities),
+                'completed': self._completed,
+                'pending': self._total_entries - self._completed,
+                # Pendentes com dueDate anterior a hoje
+                'overdue': bisect.bisect_left(self._pending_due, today),
+            }
@@ -1,8 +1,25 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, g, has_request_context, request, jsonify, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from werkzeug.security import safe_join
+import hashlib
 import json
 import os
-from datetime import datetime
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from aggregates import EntryStats
+from archive import Archive
+from backends import (BinaryBackend, JsonBackend, SqliteBackend, migrate_json_to_binary,
+                      migrate_json_to_sqlite)
+from changelog import ChangeLog
+from compression import MIN_SIZE, CompressedCache, StaticFiles, choose_encoding, compress, is_compressible
+from indexes import EntryIndexes
+from metrics import Metrics, TimedBackend
+from search_index import SearchIndex
+from store import EntryStore
 
 app = Flask(__name__)
 CORS(app)  # Permite CORS para todas as rotas
@@ -10,42 +27,418 @@ CORS(app)  # Permite CORS para todas as rotas
 # Configurações
 DATA_FILE = 'task-data.json'
 STATIC_FOLDER = '.'
+# Modo journal: cada alteração é anexada a task-data.json.journal e o
+# snapshot completo é reescrito em segundo plano (ative com JOURNAL_MODE=1)
+JOURNAL_MODE = os.environ.get('JOURNAL_MODE', '0') == '1'
+COMPACT_EVERY = 1000      # registros no journal antes de forçar compactação
+COMPACT_INTERVAL = 30     # segundos entre compactações periódicas
+# Armazenamento: 'json' (DATA_FILE), 'binary' (BINARY_FILE, snapshot
+# compacto de snapshot.py) ou 'sqlite' (SQLITE_FILE, modo WAL)
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'json')
+SQLITE_FILE = 'task-data.db'
+BINARY_FILE = 'task-data.snap'
+# 'development' (servidor do Flask com debug) ou 'production' (waitress)
+SERVER_MODE = os.environ.get('SERVER_MODE', 'development')
+SERVER_THREADS = int(os.environ.get('SERVER_THREADS', '8'))
+# Métricas em /api/metrics (formato Prometheus); METRICS_ENABLED=0 desliga
+# a coleta por completo
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+# /api/entries/events: cada conexão aberta ocupa uma thread do servidor; o
+# limite é por processo e deve ficar abaixo das threads de cada worker
+EVENT_STREAMS_MAX = int(os.environ.get('EVENT_STREAMS_MAX', max(1, SERVER_THREADS // 2)))
+EVENTS_POLL = 1.0         # segundos entre checagens de escritas de outros workers
+EVENTS_HEARTBEAT = 15     # segundos entre comentários que mantêm a conexão viva
+EVENTS_RETRY_MS = 3000    # espera do EventSource antes de reconectar
+# Tarefas concluídas há mais de ARCHIVE_AFTER_DAYS dias (pelo updatedAt) vão
+# para segmentos mensais em ARCHIVE_DIR. Desligado por padrão (0): a
+# interface ainda não mostra nem restaura tarefas arquivadas, então elas
+# sumiriam da lista
+ARCHIVE_DIR = 'task-archive'
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', '0'))
+ARCHIVE_INTERVAL = 3600   # segundos entre rodadas de arquivamento
+
+def create_backend():
+    if STORAGE_BACKEND == 'sqlite':
+        # Primeira execução com SQLite: importa o JSON existente uma única vez
+        if not os.path.exists(SQLITE_FILE) and os.path.exists(DATA_FILE):
+            count = migrate_json_to_sqlite(DATA_FILE, SQLITE_FILE)
+            print(f"{count} entradas migradas de {DATA_FILE} para {SQLITE_FILE}.")
+        return SqliteBackend(SQLITE_FILE)
+    if STORAGE_BACKEND == 'binary':
+        if not os.path.exists(BINARY_FILE) and os.path.exists(DATA_FILE):
+            count = migrate_json_to_binary(DATA_FILE, BINARY_FILE)
+            print(f"{count} entradas migradas de {DATA_FILE} para {BINARY_FILE}.")
+        return BinaryBackend(BINARY_FILE, journal=JOURNAL_MODE, compact_every=COMPACT_EVERY)
+    if STORAGE_BACKEND != 'json':
+        raise ValueError(f"STORAGE_BACKEND inválido: {STORAGE_BACKEND}")
+    return JsonBackend(DATA_FILE, journal=JOURNAL_MODE, compact_every=COMPACT_EVERY)
+
+metrics = Metrics() if METRICS_ENABLED else None
+
+# Entradas residentes em memória: o backend é lido uma vez e recarregado
+# apenas quando muda por fora
+backend = create_backend()
+if metrics is not None:
+    backend = TimedBackend(backend, metrics)
+store = EntryStore(backend, compact_interval=COMPACT_INTERVAL)
+
+# Índices secundários (category, priority, completed, date, dueDate)
+entry_indexes = EntryIndexes()
+store.add_listener(entry_indexes)
+
+# Índice invertido para /api/search (sem acentos, com prefixo e ranking)
+search_index = SearchIndex()
+store.add_listener(search_index)
+SEARCH_LIMIT = 50
+
+# Contadores de /api/stats atualizados a cada escrita
+entry_stats = EntryStats()
+store.add_listener(entry_stats)
+
+# Versão do store e histórico de alterações para sincronização incremental
+change_log = ChangeLog(store.position)
+store.add_listener(change_log)
+
+# Camada fria com as tarefas concluídas antigas (fora do store em memória)
+archive = Archive(ARCHIVE_DIR)
+archiver_started = threading.Event()
+
+REQUIRED_FIELDS = ['id', 'date', 'title', 'content']
+
+# Arquivos estáticos mantidos em memória já comprimidos, e respostas da API
+# comprimidas uma vez por versão (ETag)
+static_files = StaticFiles()
+compressed_cache = CompressedCache()
+
+# Parâmetros aceitos em GET /api/entries para filtrar pelos índices
+EQUALITY_FILTERS = {'category': 'category', 'priority': 'priority', 'completed': 'completed'}
+RANGE_FILTERS = {  # parâmetro -> (campo, limite); limites inclusivos
+    'date_from': ('date', 0),
+    'date_to': ('date', 1),
+    'due_after': ('dueDate', 0),
+    'due_before': ('dueDate', 1),
+}
+
+def parse_filters(args):
+    """Converte a query string em filtros do EntryIndexes (None se não houver filtros)"""
+    equals = {}
+    ranges = {}
+    for param, field in EQUALITY_FILTERS.items():
+        if param in args:
+            value = args[param]
+            if field == 'completed':
+                if value.lower() not in ('true', 'false', '1', '0'):
+                    raise ValueError(f'Valor inválido para {param}: {value}')
+                value = value.lower() in ('true', '1')
+            equals[field] = value
+    for param, (field, bound) in RANGE_FILTERS.items():
+        if param in args:
+            limits = ranges.setdefault(field, [None, None])
+            limits[bound] = args[param]
+    if not equals and not ranges:
+        return None
+    return equals, {field: tuple(limits) for field, limits in ranges.items()}
+
+def api_etag(*extra):
+    """ETag das respostas da API: muda a cada alteração do store"""
+    key = f"{request.path}?{request.query_string.decode()}|{'|'.join(extra)}"
+    digest = hashlib.md5(key.encode('utf-8')).hexdigest()[:8]
+    return f"{change_log.epoch}-{change_log.version}-{digest}"
+
+def is_not_modified(etag):
+    """Confere If-None-Match (incluindo as variantes comprimidas) e If-Modified-Since"""
+    if request.if_none_match:
+        candidates = [etag] + [f"{etag}-{encoding}" for encoding in ('gzip', 'br')]
+        return any(request.if_none_match.contains_weak(candidate) for candidate in candidates)
+    if request.if_modified_since and change_log.changed_at:
+        return int(change_log.changed_at) <= request.if_modified_since.timestamp()
+    return False
+
+def set_cache_headers(response, etag):
+    response.set_etag(etag, weak=True)
+    response.last_modified = change_log.changed_at
+    response.cache_control.no_cache = True  # sempre revalidar
+    return response
+
+def not_modified(etag):
+    return set_cache_headers(app.response_class(status=304), etag)
+
+STREAM_CHUNK = 500  # entradas serializadas por pedaço da resposta em stream
+
+def stream_entries(entries, ndjson=False):
+    """
+    Serializa as entradas aos poucos (array JSON ou uma entrada por linha),
+    sem montar a resposta inteira na memória. As entradas nunca são alteradas
+    no lugar pelo store, então a lista é um retrato consistente.
+    """
+    if not ndjson:
+        yield '['
+    for start in range(0, len(entries), STREAM_CHUNK):
+        chunk = [json.dumps(entry, ensure_ascii=False) for entry in entries[start:start + STREAM_CHUNK]]
+        if ndjson:
+            yield '\n'.join(chunk) + '\n'
+        else:
+            yield (',' if start else '') + ','.join(chunk)
+    if not ndjson:
+        yield ']'
+
+def format_event(event, data, event_id=None):
+    """Mensagem no formato text/event-stream"""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return '\n'.join(lines) + '\n\n'
+
+class EventStreams:
+    """Limita quantas conexões de /api/entries/events ficam abertas"""
+
+    def __init__(self, limit):
+        self._lock = threading.Lock()
+        self.limit = limit
+        self.open = 0
+
+    def acquire(self):
+        with self._lock:
+            if self.open >= self.limit:
+                return False
+            self.open += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.open -= 1
+
+event_streams = EventStreams(EVENT_STREAMS_MAX)
+
+def stream_changes(epoch, version):
+    """
+    Envia cada alteração do ChangeLog posterior a (época, versão) assim que
+    ela acontece. Escritas deste processo acordam a espera na hora; as de
+    outros workers são vistas pelo refresh a cada EVENTS_POLL segundos.
+    """
+    yield f"retry: {EVENTS_RETRY_MS}\n\n"
+    last_sent = time.monotonic()
+    while True:
+        store.refresh()
+        changes = change_log.since(epoch, version)
+        if changes is None:
+            # Histórico não cobre a posição do cliente: ele recarrega tudo
+            epoch, version = change_log.position()
+            yield format_event('reset', {'epoch': epoch, 'version': version}, f"{epoch}:{version}")
+            last_sent = time.monotonic()
+        elif changes:
+            for change in changes:
+                yield format_event('change', change, f"{epoch}:{change['version']}")
+            version = changes[-1]['version']
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= EVENTS_HEARTBEAT:
+            yield ': ping\n\n'
+            last_sent = time.monotonic()
+        change_log.wait(epoch, version, EVENTS_POLL)
 
 def load_entries():
-    try:
-        if os.path.exists(DATA_FILE):
-            with open(DATA_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return []
-    except Exception as e:
-        print(f"Erro ao carregar entradas: {e}")
-        return []
+    return store.all()
+
+# --- Arquivo morto ---
+
+def archive_completed(days=None):
+    """Move para o arquivo as tarefas concluídas há mais de `days` dias"""
+    days = ARCHIVE_AFTER_DAYS if days is None else days
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%dT%H:%M:%S')
+    
+    def is_old_and_completed(entry):
+        changed = entry.get('updatedAt') or entry.get('date') or ''
+        return bool(entry.get('completed')) and bool(changed) and changed < cutoff
+    
+    # move_out segura o lock entre processos, então o arquivo também fica protegido
+    return store.move_out(is_old_and_completed, archive.add)
+
+def archive_loop():
+    while True:
+        try:
+            moved = archive_completed()
+            if moved:
+                print(f"{len(moved)} tarefas concluídas movidas para {ARCHIVE_DIR}.")
+        except Exception as e:
+            print(f"Erro ao arquivar tarefas: {e}")
+        time.sleep(ARCHIVE_INTERVAL)
+
+@app.before_request
+def start_archiver():
+    """Inicia o arquivamento periódico na primeira requisição de cada worker"""
+    if ARCHIVE_AFTER_DAYS > 0 and not archiver_started.is_set():
+        archiver_started.set()
+        threading.Thread(target=archive_loop, daemon=True).start()
+
+# --- Métricas ---
+
+def add_stage_time(stage, seconds):
+    """Soma o tempo de uma etapa (json_load, json_dump) à requisição atual"""
+    if has_request_context() and 'metrics_stages' in g:
+        g.metrics_stages[stage] = g.metrics_stages.get(stage, 0.0) + seconds
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON do Flask (jsonify e request.get_json) com o tempo de cada chamada medido"""
+
+    def dumps(self, obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            add_stage_time('json_dump', time.perf_counter() - started)
+
+    def loads(self, s, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().loads(s, **kwargs)
+        finally:
+            add_stage_time('json_load', time.perf_counter() - started)
+
+def storage_bytes():
+    """Tamanho em disco dos arquivos de dados do backend atual"""
+    if STORAGE_BACKEND == 'sqlite':
+        paths = [SQLITE_FILE, f"{SQLITE_FILE}-wal"]
+    else:
+        data_file = BINARY_FILE if STORAGE_BACKEND == 'binary' else DATA_FILE
+        paths = [data_file, f"{data_file}.journal", f"{data_file}.journal.old"]
+    return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+if metrics is not None:
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+        g.metrics_stages = {}
+
+    # Registrado antes de compress_response, então roda depois dele e mede
+    # também a compressão
+    @app.after_request
+    def record_request_metrics(response):
+        if 'metrics_started' not in g:
+            return response
+        elapsed = time.perf_counter() - g.metrics_started
+        stages = g.metrics_stages
+        stages['handler'] = max(0.0, elapsed - sum(stages.values()))
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        response_bytes = None if response.is_streamed else response.calculate_content_length()
+        metrics.observe_request(request.method, route, response.status_code, elapsed, stages,
+                                request.content_length or 0, response_bytes)
+        return response
 
 def save_entries(entries):
-    try:
-        with open(DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(entries, f, ensure_ascii=False, indent=2)
-        return True
-    except Exception as e:
-        print(f"Erro ao salvar entradas: {e}")
-        return False
+    return store.replace_all(entries)
 
 # Servir arquivos estáticos (HTML, CSS, JS)
+def send_static(filename):
+    """Serve arquivos de texto a partir do cache pré-comprimido, com 304"""
+    path = safe_join(STATIC_FOLDER, filename)
+    cached = static_files.get(path) if path else None
+    if cached is None:
+        return send_from_directory(STATIC_FOLDER, filename)
+    
+    encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+    if encoding not in cached['variants']:
+        encoding = 'identity'
+    response = app.response_class(cached['variants'][encoding], mimetype=cached['mimetype'])
+    if encoding == 'identity':
+        response.set_etag(cached['etag'])
+    else:
+        response.headers['Content-Encoding'] = encoding
+        response.set_etag(f"{cached['etag']}-{encoding}")
+    response.last_modified = cached['mtime']
+    response.vary.add('Accept-Encoding')
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
 @app.route('/')
 def serve_index():
-    return send_from_directory(STATIC_FOLDER, 'index.html')
+    return send_static('index.html')
 
 @app.route('/<path:filename>')
 def serve_static(filename):
-    return send_from_directory(STATIC_FOLDER, filename)
+    return send_static(filename)
+
+@app.after_request
+def compress_response(response):
+    """Comprime respostas da API (gzip, ou brotli se instalado)"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or not is_compressible(response.mimetype)):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if len(data) < MIN_SIZE:
+        return response
+    etag, weak = response.get_etag()
+    if etag:
+        body = compressed_cache.get_or_compress(etag, data, encoding)
+        response.set_etag(f"{etag}-{encoding}", weak=weak)
+    else:
+        body = compress(data, encoding)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
 
 # API Routes
 @app.route('/api/entries', methods=['GET'])
 def get_entries():
-    """Retorna todas as entradas do diário"""
+    """
+    Retorna todas as entradas do diário, ou apenas as que passam pelos filtros
+    (ex.: ?category=study&completed=false&due_before=2025-08-01).
+    Com limit/after pagina por cursor (ordem de id) e responde
+    {"entries": [...], "next": <cursor>}; com stream=json ou stream=ndjson
+    envia a resposta em pedaços.
+    """
     try:
-        entries = load_entries()
-        return jsonify(entries), 200
+        try:
+            filters = parse_filters(request.args)
+            limit = request.args.get('limit')
+            limit = int(limit) if limit is not None else None
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if limit is not None and limit < 1:
+            return jsonify({'error': 'limit deve ser maior que zero'}), 400
+        after = request.args.get('after')
+        paginated = limit is not None or after is not None
+        stream = request.args.get('stream')
+        if stream not in (None, 'json', 'ndjson'):
+            return jsonify({'error': 'stream deve ser json ou ndjson'}), 400
+        
+        # A versão é lida antes das entradas: no pior caso o cliente recebe
+        # de novo, em /api/entries/changes, algo que já tem
+        store.refresh()
+        epoch, version = change_log.epoch, change_log.version
+        etag = api_etag()
+        if is_not_modified(etag):
+            return not_modified(etag)
+        
+        ids = None if filters is None else entry_indexes.query(*filters)
+        next_cursor = None
+        if paginated:
+            page_ids, next_cursor = entry_indexes.page(after, limit, ids)
+            entries = store.get_many(page_ids)
+        elif ids is None:
+            entries = load_entries()
+        else:
+            entries = store.get_many(sorted(ids))
+        
+        if stream == 'ndjson':
+            response = app.response_class(stream_entries(entries, ndjson=True), mimetype='application/x-ndjson')
+        elif stream == 'json':
+            response = app.response_class(stream_entries(entries), mimetype='application/json')
+        elif paginated:
+            response = jsonify({'entries': entries, 'next': next_cursor})
+        else:
+            response = jsonify(entries)
+        if next_cursor is not None:
+            response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['X-Entries-Epoch'] = epoch
+        response.headers['X-Entries-Version'] = str(version)
+        return set_cache_headers(response, etag), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -59,8 +452,7 @@ def save_entries_api():
         
         # Validar estrutura das entradas
         for entry in data:
-            required_fields = ['id', 'date', 'title', 'content']
-            for field in required_fields:
+            for field in REQUIRED_FIELDS:
                 if field not in entry:
                     return jsonify({'error': f'Campo obrigatório ausente: {field}'}), 400
         
@@ -72,14 +464,127 @@ def save_entries_api():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/entries/sync', methods=['POST'])
+def sync_entries():
+    """
+    Aplica apenas o que mudou no cliente, em uma única requisição:
+    {"upserts": [entrada, ...], "deletes": [{"id": ..., "updatedAt": ...}, ...]}
+    Conflitos são resolvidos por updatedAt (vence a alteração mais recente).
+    """
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Dados devem ser um objeto com upserts e deletes'}), 400
+        upserts = data.get('upserts', [])
+        if not isinstance(upserts, list):
+            return jsonify({'error': 'upserts deve ser uma lista de entradas'}), 400
+        deletes = data.get('deletes', [])
+        if not isinstance(deletes, list):
+            return jsonify({'error': 'deletes deve ser uma lista de ids ou entradas'}), 400
+        deletes = [d if isinstance(d, dict) else {'id': d} for d in deletes]
+        
+        # Validar estrutura: entradas novas precisam de todos os campos
+        for entry in upserts + deletes:
+            if not isinstance(entry, dict) or 'id' not in entry:
+                return jsonify({'error': 'Campo obrigatório ausente: id'}), 400
+        for entry in upserts:
+            if store.get(entry['id']) is None:
+                for field in REQUIRED_FIELDS:
+                    if field not in entry:
+                        return jsonify({'error': f'Campo obrigatório ausente: {field}'}), 400
+        
+        try:
+            applied, conflicts = store.apply_batch(upserts, deletes)
+        except IOError as e:
+            return jsonify({'error': str(e)}), 500
+        
+        return jsonify({
+            'applied': applied,
+            'conflicts': conflicts,
+            'epoch': change_log.epoch,
+            'version': change_log.version
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/entries/changes', methods=['GET'])
+def get_changes():
+    """
+    Retorna as alterações desde a versão informada (?since=N&epoch=...).
+    Se o histórico não cobre essa versão, responde com reset e a lista inteira.
+    """
+    try:
+        try:
+            since = int(request.args.get('since', 0))
+        except ValueError:
+            return jsonify({'error': 'since deve ser um número inteiro'}), 400
+        
+        store.refresh()
+        epoch, version = change_log.epoch, change_log.version
+        changes = change_log.since(request.args.get('epoch'), since)
+        if changes is None:
+            return jsonify({
+                'reset': True,
+                'epoch': epoch,
+                'version': version,
+                'entries': load_entries()
+            }), 200
+        return jsonify({
+            'reset': False,
+            'epoch': epoch,
+            'version': changes[-1]['version'] if changes else since,
+            'changes': changes
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/entries/events', methods=['GET'])
+def entry_events():
+    """
+    Server-sent events com cada alteração de entrada (evento 'change', no
+    mesmo formato de /api/entries/changes) logo após a escrita. Sem
+    ?epoch=...&since=N (ou Last-Event-ID) começa da versão atual; se o
+    histórico não cobre a posição pedida, envia um evento 'reset'.
+    """
+    try:
+        store.refresh()
+        position = request.headers.get('Last-Event-ID')
+        if position and ':' in position:
+            epoch, _, since = position.rpartition(':')
+        elif 'epoch' in request.args:
+            epoch, since = request.args['epoch'], request.args.get('since', 0)
+        else:
+            epoch, since = change_log.position()
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify({'error': 'since deve ser um número inteiro'}), 400
+        
+        if not event_streams.acquire():
+            return jsonify({'error': 'Muitas conexões de eventos abertas'}), 503
+        response = app.response_class(stream_changes(epoch, since), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'   # proxies (nginx) não devem segurar os eventos
+        # Chamado pelo servidor quando o cliente desconecta, mesmo que o
+        # gerador nem tenha começado
+        response.call_on_close(event_streams.release)
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/entries/<entry_id>', methods=['GET'])
 def get_entry(entry_id):
     """Retorna uma entrada específica"""
     try:
-        entries = load_entries()
-        entry = next((e for e in entries if str(e['id']) == str(entry_id)), None)
+        store.refresh()
+        etag = api_etag()
+        if is_not_modified(etag):
+            return not_modified(etag)
+        entry = store.get(entry_id)
         if entry:
-            return jsonify(entry), 200
+            return set_cache_headers(jsonify(entry), etag), 200
         else:
             return jsonify({'error': 'Entrada não encontrada'}), 404
     except Exception as e:
@@ -90,18 +595,18 @@ def update_entry(entry_id):
     """Atualiza uma entrada específica"""
     try:
         data = request.get_json()
-        entries = load_entries()
         
         # Encontrar e atualizar a entrada
-        for i, entry in enumerate(entries):
-            if str(entry['id']) == str(entry_id):
-                entries[i].update(data)
-                if save_entries(entries):
-                    return jsonify(entries[i]), 200
-                else:
-                    return jsonify({'error': 'Erro ao salvar entrada'}), 500
+        try:
+            entry = store.update(entry_id, data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 409
+        except IOError as e:
+            return jsonify({'error': str(e)}), 500
         
-        return jsonify({'error': 'Entrada não encontrada'}), 404
+        if entry is None:
+            return jsonify({'error': 'Entrada não encontrada'}), 404
+        return jsonify(entry), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -110,17 +615,13 @@ def update_entry(entry_id):
 def delete_entry(entry_id):
     """Deleta uma entrada específica"""
     try:
-        entries = load_entries()
-        original_length = len(entries)
+        try:
+            deleted = store.delete(entry_id)
+        except IOError as e:
+            return jsonify({'error': str(e)}), 500
         
-        # Filtrar para remover a entrada
-        entries = [e for e in entries if str(e['id']) != str(entry_id)]
-        
-        if len(entries) < original_length:
-            if save_entries(entries):
-                return jsonify({'message': 'Entrada deletada com sucesso'}), 200
-            else:
-                return jsonify({'error': 'Erro ao salvar após deletar'}), 500
+        if deleted:
+            return jsonify({'message': 'Entrada deletada com sucesso'}), 200
         else:
             return jsonify({'error': 'Entrada não encontrada'}), 404
             
@@ -129,23 +630,100 @@ def delete_entry(entry_id):
 
 @app.route('/api/search', methods=['GET'])
 def search_entries():
-    """Busca entradas por termo"""
+    """
+    Busca entradas por termo, ordenadas por relevância (?q=...&limit=...).
+    Com include_archived=true também procura no arquivo morto.
+    """
     try:
-        query = request.args.get('q', '').lower()
+        query = request.args.get('q', '')
         if not query:
             return jsonify([]), 200
-            
-        entries = load_entries()
-        results = []
         
-        for entry in entries:
-            if (query in entry['title'].lower() or 
-                query in entry['content'].lower() or
-                query in entry['date']):
-                results.append(entry)
+        try:
+            limit = int(request.args.get('limit', SEARCH_LIMIT))
+        except ValueError:
+            return jsonify({'error': 'limit deve ser um número inteiro'}), 400
+        if limit < 1:
+            return jsonify({'error': 'limit deve ser maior que zero'}), 400
+        
+        include_archived = request.args.get('include_archived', 'false').lower() in ('true', '1')
+        
+        store.refresh()
+        if include_archived:
+            # O arquivo muda por fora do store: sem ETag
+            ranked = [(store.get(entry_id), score) for entry_id, score in search_index.search(query, limit=limit)]
+            hot_ids = {str(entry['id']) for entry, _ in ranked if entry}
+            ranked += [(entry, score) for entry, score in archive.search(query, limit=limit)
+                       if str(entry['id']) not in hot_ids]
+            ranked.sort(key=lambda item: -item[1])
+            return jsonify([entry for entry, _ in ranked[:limit] if entry]), 200
+        
+        etag = api_etag()
+        if is_not_modified(etag):
+            return not_modified(etag)
+        ranked = search_index.search(query, limit=limit)
+        results = store.get_many([entry_id for entry_id, _ in ranked])
+        
+        return set_cache_headers(jsonify(results), etag), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/archive', methods=['GET'])
+def get_archived_entries():
+    """
+    Tarefas arquivadas, com os mesmos filtros de GET /api/entries
+    (ex.: ?date_from=2024-01-01&date_to=2024-03-31&category=work).
+    Só os segmentos dos meses do intervalo de date são lidos.
+    """
+    try:
+        try:
+            filters = parse_filters(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        equals, ranges = filters if filters is not None else ({}, {})
+        return jsonify(archive.query(equals, ranges)), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/archive/run', methods=['POST'])
+def run_archive():
+    """Arquiva agora (?days=N sobrepõe ARCHIVE_AFTER_DAYS)"""
+    try:
+        if 'days' not in request.args and ARCHIVE_AFTER_DAYS <= 0:
+            # Sem limite configurado, days=0 arquivaria todas as concluídas
+            return jsonify({'error': 'Informe ?days=N (ARCHIVE_AFTER_DAYS está desligado)'}), 400
+        try:
+            days = int(request.args.get('days', ARCHIVE_AFTER_DAYS))
+        except ValueError:
+            return jsonify({'error': 'days deve ser um número inteiro'}), 400
+        try:
+            moved = archive_completed(days)
+        except IOError as e:
+            return jsonify({'error': str(e)}), 500
+        return jsonify({'archived': [entry['id'] for entry in moved]}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/archive/<entry_id>/restore', methods=['POST'])
+def restore_archived_entry(entry_id):
+    """Traz uma tarefa arquivada de volta para a lista"""
+    try:
+        def fetch():
+            entry = archive.get(entry_id)
+            if entry is None:
+                return []
+            # updatedAt novo: não volta para o arquivo na próxima rodada
+            return [{**entry, 'updatedAt': datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')}]
         
-        return jsonify(results), 200
+        try:
+            restored = store.move_in(fetch, lambda entries: archive.remove(entry_id))
+        except IOError as e:
+            return jsonify({'error': str(e)}), 500
         
+        if not restored:
+            return jsonify({'error': 'Entrada não encontrada no arquivo'}), 404
+        return jsonify(restored[0]), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -153,28 +731,33 @@ def search_entries():
 def get_stats():
     """Retorna estatísticas do diário"""
     try:
-        entries = load_entries()
-        total_entries = len(entries)
-        total_words = sum(len(entry['content'].split()) for entry in entries)
-        
-        # Estatísticas por ano
-        years_stats = {}
-        for entry in entries:
-            year = entry['date'][:4]  # Assume formato YYYY-MM-DD
-            if year not in years_stats:
-                years_stats[year] = {'entries': 0, 'words': 0}
-            years_stats[year]['entries'] += 1
-            years_stats[year]['words'] += len(entry['content'].split())
-        
-        return jsonify({
-            'total_entries': total_entries,
-            'total_words': total_words,
-            'years': years_stats
-        }), 200
+        store.refresh()
+        # overdue depende do dia, então a data também entra no ETag
+        today = date.today().isoformat()
+        etag = api_etag(today)
+        if is_not_modified(etag):
+            return not_modified(etag)
+        return set_cache_headers(jsonify(entry_stats.snapshot(today)), etag), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Métricas no formato de texto do Prometheus"""
+    if metrics is None:
+        return jsonify({'error': 'Métricas desativadas (METRICS_ENABLED=0)'}), 404
+    try:
+        gauges = [
+            ('entries_store_entries', 'Entradas em memória', store.count()),
+            ('entries_store_version', 'Versão do store (a mesma em todos os workers)', change_log.version),
+            ('entries_storage_bytes', 'Tamanho dos arquivos de dados em disco', storage_bytes()),
+            ('entries_event_streams_open', 'Conexões abertas em /api/entries/events', event_streams.open),
+        ]
+        return app.response_class(metrics.render(gauges), mimetype='text/plain; version=0.0.4'), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Endpoint para verificar se o servidor está funcionando"""
@@ -186,12 +769,36 @@ def health_check():
 
 if __name__ == '__main__':
     # Verificar se o arquivo de dados existe, se não, criar um vazio
-    if not os.path.exists(DATA_FILE):
+    if STORAGE_BACKEND == 'json' and not os.path.exists(DATA_FILE):
         save_entries([])
         print(f"Arquivo {DATA_FILE} criado.")
     
+    # Carrega as entradas na memória uma única vez
+    store.refresh()
     print(f"Servidor iniciando...")
-    print(f"Arquivo de dados: {DATA_FILE}")
+    if STORAGE_BACKEND == 'sqlite':
+        print(f"Banco de dados: {SQLITE_FILE}")
+    else:
+        print(f"Arquivo de dados: {store.backend.path}")
+        if JOURNAL_MODE:
+            print(f"Modo journal ativo: {store.backend.journal_path}")
     print(f"Acesse: http://localhost:5001")
     
-    app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
+    if SERVER_MODE == 'production':
+        # Servidor WSGI com várias threads. Para vários processos use
+        # workers com threads, por exemplo
+        # `SERVER_THREADS=8 gunicorn -w 4 -k gthread --threads 8 app:app`
+        # (sem --preload): cada conexão de /api/entries/events prende uma
+        # thread enquanto está aberta, então o worker síncrono padrão do
+        # gunicorn travaria a API com poucas abas abertas. Os workers
+        # coordenam as escritas pelo arquivo .lock, recarregam as alterações
+        # uns dos outros e compartilham época e versão pelo backend
+        try:
+            from waitress import serve
+        except ImportError:
+            print("Modo produção requer o waitress: pip install waitress")
+            sys.exit(1)
+        print(f"Modo produção: {SERVER_THREADS} threads")
+        serve(app, host='0.0.0.0', port=5001, threads=SERVER_THREADS)
+    else:
+        app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
@@ -0,0 +1,142 @@
+import os
+import re
+import threading
+
+from backends import atomic_write_json, read_json_entries
+from search_index import SearchIndex
+
+# Segmentos mensais: task-archive/2025-07.json
+SEGMENT_RE = re.compile(r'^(\d{4}-\d{2}|sem-data)\.json$')
+
+
+def segment_key(entry):
+    """Mês da entrada (YYYY-MM) a partir de date; 'sem-data' se não houver"""
+    entry_date = str(entry.get('date') or '')
+    return entry_date[:7] if re.match(r'^\d{4}-\d{2}', entry_date) else 'sem-data'
+
+
+def matches(entry, equals, ranges):
+    """Mesmos filtros do EntryIndexes (igualdade e intervalos inclusivos)"""
+    for field, value in equals.items():
+        current = bool(entry.get(field, False)) if field == 'completed' else entry.get(field)
+        if current != value:
+            return False
+    for field, (low, high) in ranges.items():
+        value = entry.get(field) or ''
+        if not value or (low is not None and value < low) or (high is not None and value > high):
+            return False
+    return True
+
+
+class Archive:
+    """
+    Camada fria: tarefas concluídas antigas saem do EntryStore e vão para
+    segmentos JSON por mês (pelo campo date). Os segmentos só são lidos em
+    consultas ao arquivo ou buscas com include_archived; o índice de busca
+    do arquivo é montado na primeira busca e refeito quando algum segmento
+    muda (inclusive por outro worker).
+
+    As escritas devem acontecer com o lock entre processos do backend.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._signature = None
+        self._entries = {}     # id -> entrada, só depois da primeira busca
+        self._search = None
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def segments(self):
+        """Chaves (YYYY-MM) dos segmentos existentes, em ordem"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(m.group(1) for m in map(SEGMENT_RE.match, os.listdir(self.directory)) if m)
+
+    def _read(self, key):
+        return read_json_entries(self._path(key))
+
+    def signature(self):
+        signature = []
+        for key in self.segments():
+            st = os.stat(self._path(key))
+            signature.append((key, st.st_ino, st.st_mtime_ns, st.st_size))
+        return tuple(signature)
+
+    # --- Escrita ---
+
+    def add(self, entries):
+        """Grava as entradas nos segmentos (substitui as de mesmo id)"""
+        by_segment = {}
+        for entry in entries:
+            by_segment.setdefault(segment_key(entry), []).append(entry)
+        os.makedirs(self.directory, exist_ok=True)
+        for key, new_entries in by_segment.items():
+            merged = {str(e['id']): e for e in self._read(key)}
+            merged.update((str(e['id']), e) for e in new_entries)
+            atomic_write_json(self._path(key), list(merged.values()), separators=(',', ':'))
+
+    def get(self, entry_id):
+        entry_id = str(entry_id)
+        for key in self.segments():
+            for entry in self._read(key):
+                if str(entry['id']) == entry_id:
+                    return entry
+        return None
+
+    def remove(self, entry_id):
+        """Tira uma entrada do arquivo e a retorna (None se não estiver lá)"""
+        entry_id = str(entry_id)
+        for key in self.segments():
+            entries = self._read(key)
+            kept = [e for e in entries if str(e['id']) != entry_id]
+            if len(kept) == len(entries):
+                continue
+            if kept:
+                atomic_write_json(self._path(key), kept, separators=(',', ':'))
+            else:
+                os.remove(self._path(key))
+            return next(e for e in entries if str(e['id']) == entry_id)
+        return None
+
+    # --- Consultas ---
+
+    def query(self, equals=None, ranges=None):
+        """
+        Entradas arquivadas que passam pelos filtros. Com intervalo em date,
+        só os segmentos dos meses envolvidos são lidos.
+        """
+        equals = equals or {}
+        ranges = ranges or {}
+        low, high = ranges.get('date', (None, None))
+        results = []
+        for key in self.segments():
+            if key != 'sem-data':
+                if (low and key < low[:7]) or (high and key > high[:7]):
+                    continue
+            elif low or high:
+                continue
+            results.extend(e for e in self._read(key) if matches(e, equals, ranges))
+        return results
+
+    def _ensure_index(self):
+        """Carrega os segmentos e monta o índice se algo mudou desde a última vez"""
+        signature = self.signature()
+        if signature == self._signature:
+            return
+        entries = {}
+        for key in self.segments():
+            for entry in self._read(key):
+                entries[str(entry['id'])] = entry
+        index = SearchIndex()
+        index.reset(list(entries.values()))
+        self._entries, self._search, self._signature = entries, index, signature
+
+    def search(self, query, limit=50):
+        """Retorna [(entrada, score)] em ordem de relevância"""
+        with self._lock:
+            self._ensure_index()
+            return [(self._entries[entry_id], score)
+                    for entry_id, score in self._search.search(query, limit=limit)]
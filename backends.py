@@ -0,0 +1,445 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import uuid
+
+from locks import InterProcessLock
+from snapshot import read_snapshot, write_snapshot
+
+
+def atomic_write_json(path, data, **dump_kwargs):
+    """
+    Escreve o JSON em um arquivo temporário, faz fsync e só então
+    renomeia por cima do destino. Um crash no meio nunca deixa o
+    arquivo pela metade.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, **dump_kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_json_entries(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class WriteCounter:
+    """
+    Contador de gravações em um arquivo ao lado dos dados, incrementado (sob
+    o lock entre processos) a cada escrita. mtime/tamanho sozinhos não bastam
+    para outro worker perceber a mudança: o relógio dos arquivos tem resolução
+    de milissegundos e uma regravação pode ter o mesmo tamanho e até reusar
+    o mesmo inode.
+
+    O mesmo arquivo guarda a posição do histórico de alterações (época e
+    versão, ver changelog.py), para que todos os workers usem os mesmos
+    números: "gravações época versão".
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def read(self):
+        try:
+            with open(self.path, 'r', encoding='ascii') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def position(self):
+        """(época, versão) gravadas, ou (None, 0) se ainda não há posição"""
+        parts = (self.read() or '').split()
+        try:
+            return parts[1], int(parts[2])
+        except (IndexError, ValueError):
+            return None, 0
+
+    def bump(self, position=None):
+        """Incrementa o contador; sem position mantém a posição gravada"""
+        parts = (self.read() or '').split()
+        try:
+            value = int(parts[0]) + 1
+        except (IndexError, ValueError):
+            value = 1
+        epoch, version = self.position() if position is None else position
+        with open(self.path, 'w', encoding='ascii') as f:
+            f.write(str(value) if epoch is None else f"{value} {epoch} {version}")
+
+
+class JsonBackend:
+    """
+    Persistência no arquivo JSON (task-data.json).
+
+    Com journal=True cada escrita é apenas anexada (com fsync) ao arquivo
+    de journal em vez de reescrever o snapshot inteiro; o EntryStore chama
+    a compactação em segundo plano para reescrever o snapshot.
+
+    `lock` serializa leituras e escritas entre processos (vários workers);
+    o EntryStore o segura durante recargas e escritas.
+    """
+
+    def __init__(self, path, journal=False, compact_every=1000):
+        self.path = path
+        self.journal = journal
+        self.journal_path = f"{path}.journal"
+        self.compact_every = compact_every
+        self.compact_wanted = threading.Event()
+        self.lock = InterProcessLock(f"{path}.lock")
+        self.counter = WriteCounter(f"{path}.version")
+        self._journal_records = 0
+
+    @property
+    def supports_compaction(self):
+        return self.journal
+
+    def signature(self):
+        """
+        Muda sempre que alguém (este ou outro processo) altera os arquivos.
+        O inode entra porque toda regravação do snapshot é um rename.
+        """
+        paths = [self.path]
+        if self.journal:
+            paths += [self.journal_path, f"{self.journal_path}.old"]
+        signature = [self.counter.read()]
+        for path in paths:
+            try:
+                st = os.stat(path)
+                signature.append((st.st_ino, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    # --- Formato do snapshot (BinaryBackend troca só estes dois) ---
+
+    def _read_snapshot(self):
+        return read_json_entries(self.path)
+
+    def _write_snapshot(self, entries):
+        atomic_write_json(self.path, entries, indent=2)
+
+    # --- Leitura ---
+
+    def load(self):
+        entries = {}
+        try:
+            for entry in self._read_snapshot():
+                entries[str(entry['id'])] = entry
+        except Exception as e:
+            print(f"Erro ao carregar entradas: {e}")
+        self._journal_records = 0
+        if self.journal:
+            # O .old só existe se um crash interrompeu a compactação;
+            # reaplicá-lo sobre o snapshot é seguro porque as operações
+            # são idempotentes (entrada completa ou remoção)
+            for path in (f"{self.journal_path}.old", self.journal_path):
+                self._journal_records += self._replay_journal(path, entries)
+        return list(entries.values())
+
+    def _replay_journal(self, path, entries):
+        """
+        Reaplica o journal sobre entries; retorna quantas alterações aplicou.
+        Uma última linha sem '\n' é o resto de um crash no meio do append e
+        é cortada do arquivo (load roda com o lock): se ficasse, o próximo
+        registro seria anexado a ela e se perderia junto.
+        """
+        if not os.path.exists(path):
+            return 0
+        applied = 0
+        complete = 0   # bytes até o fim da última linha completa
+        torn = False
+        with open(path, 'rb+') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    torn = True
+                    break
+                complete += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    print(f"Registro inválido ignorado no journal {path}")
+                    continue
+                if record['op'] == 'put':
+                    entries[str(record['id'])] = record['entry']
+                elif record['op'] == 'delete':
+                    entries.pop(str(record['id']), None)
+                else:
+                    continue   # 'mark' da compactação
+                applied += 1
+            if torn:
+                print(f"Registro incompleto removido do fim do journal {path}")
+                f.truncate(complete)
+                f.flush()
+                os.fsync(f.fileno())
+        return applied
+
+    def position(self):
+        return self.counter.position()
+
+    # --- Escrita ---
+
+    def set_position(self, epoch, version):
+        """Grava só a posição do histórico (época nova após uma recarga)"""
+        try:
+            self.counter.bump((epoch, version))
+            return True
+        except OSError as e:
+            print(f"Erro ao gravar a versão das entradas: {e}")
+            return False
+
+    def write_all(self, entries, position=None):
+        try:
+            self._write_snapshot(entries)
+            self.counter.bump(position)
+            if self.journal:
+                for path in (self.journal_path, f"{self.journal_path}.old"):
+                    if os.path.exists(path):
+                        os.remove(path)
+                self._journal_records = 0
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar entradas: {e}")
+            return False
+
+    def write_records(self, records, all_entries, position=None):
+        """
+        Grava alterações de entradas individuais. Sem journal o arquivo
+        inteiro é reescrito a partir de all_entries(). position é a nova
+        (época, versão), gravada junto.
+        """
+        if not self.journal:
+            return self.write_all(all_entries(), position)
+        try:
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self.counter.bump(position)
+            self._journal_records += len(records)
+            if self._journal_records >= self.compact_every:
+                self.compact_wanted.set()
+            return True
+        except Exception as e:
+            print(f"Erro ao gravar no journal: {e}")
+            return False
+
+    # --- Compactação do journal ---
+
+    def begin_compaction(self):
+        """
+        Rotaciona o journal para .old (chamado com o lock do store e `lock`),
+        para que as escritas seguintes continuem em um journal novo enquanto
+        o snapshot é gravado. Retorna um token para finish_compaction, ou None.
+        """
+        old_path = f"{self.journal_path}.old"
+        if not os.path.exists(self.journal_path):
+            return None
+        if os.path.exists(old_path):
+            # Outra compactação em andamento (ou interrompida por um crash):
+            # o journal é acumulado no mesmo .old, que nunca é descartado
+            # sem que um snapshot o cubra
+            with open(self.journal_path, 'rb') as src, open(old_path, 'ab') as dst:
+                shutil.copyfileobj(src, dst)
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.remove(self.journal_path)
+        else:
+            os.replace(self.journal_path, old_path)
+        # Marca o .old como desta compactação; a de outro processo que
+        # rotacionou antes vê a marca trocada e desiste. Registros 'mark'
+        # são ignorados na reaplicação
+        token = uuid.uuid4().hex
+        with open(old_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'op': 'mark', 'token': token}) + '\n')
+        self.counter.bump()
+        self._journal_records = 0
+        return token
+
+    def finish_compaction(self, token, entries):
+        """
+        Grava o snapshot (fora do lock do store) e descarta o journal rotacionado.
+        Retorna as assinaturas (antes, depois) da gravação, ou None se nada
+        foi gravado.
+        """
+        old_path = f"{self.journal_path}.old"
+        try:
+            with self.lock:
+                # Se o .old sumiu ou é outro, um write_all ou a compactação de
+                # outro processo já gravou um snapshot mais novo
+                if self._old_journal_token(old_path) != token:
+                    return None
+                before = self.signature()
+                self._write_snapshot(entries)
+                os.remove(old_path)
+                self.counter.bump()
+                return before, self.signature()
+        except Exception as e:
+            print(f"Erro ao compactar journal: {e}")
+            return None
+
+
+    @staticmethod
+    def _old_journal_token(path):
+        try:
+            with open(path, 'rb') as f:
+                f.seek(max(0, os.path.getsize(path) - 128))
+                last_line = f.read().splitlines()[-1]
+            return json.loads(last_line).get('token')
+        except (FileNotFoundError, IndexError, ValueError):
+            return None
+
+
+class BinaryBackend(JsonBackend):
+    """
+    Igual ao JsonBackend (inclusive o journal), mas com o snapshot no
+    formato binário de snapshot.py, mais compacto e rápido de carregar.
+    """
+
+    def _read_snapshot(self):
+        return read_snapshot(self.path)
+
+    def _write_snapshot(self, entries):
+        write_snapshot(self.path, entries)
+
+
+class SqliteBackend:
+    """
+    Persistência em SQLite (modo WAL): cada alteração grava só as linhas
+    afetadas, leitores concorrentes não bloqueiam a escrita e as colunas
+    usadas em filtros têm índices próprios. A entrada completa fica em
+    `data` (JSON), então campos novos não exigem migração de esquema.
+    """
+
+    INDEXED_COLUMNS = ('date', 'dueDate', 'category', 'priority', 'completed')
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = InterProcessLock(f"{path}.lock")
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' id TEXT PRIMARY KEY, date TEXT, dueDate TEXT, category TEXT,'
+            ' priority TEXT, completed INTEGER, data TEXT NOT NULL)'
+        )
+        for column in self.INDEXED_COLUMNS:
+            self._conn.execute(f'CREATE INDEX IF NOT EXISTS idx_entries_{column} ON entries ({column})')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+
+    supports_compaction = False
+
+    def close(self):
+        self._conn.close()
+
+    def signature(self):
+        """data_version muda quando outra conexão (outro processo) grava no banco"""
+        return self._conn.execute('PRAGMA data_version').fetchone()[0]
+
+    @staticmethod
+    def _row(entry):
+        return (
+            str(entry['id']),
+            entry.get('date'),
+            entry.get('dueDate'),
+            entry.get('category'),
+            entry.get('priority'),
+            int(bool(entry.get('completed', False))),
+            json.dumps(entry, ensure_ascii=False),
+        )
+
+    def load(self):
+        # rowid preserva a ordem de inserção (o upsert mantém o rowid)
+        rows = self._conn.execute('SELECT data FROM entries ORDER BY rowid')
+        return [json.loads(data) for (data,) in rows]
+
+    def position(self):
+        rows = dict(self._conn.execute("SELECT key, value FROM meta WHERE key IN ('epoch', 'version')"))
+        if 'epoch' not in rows:
+            return None, 0
+        return rows['epoch'], int(rows.get('version') or 0)
+
+    @staticmethod
+    def _position_statements(position):
+        if position is None:
+            return []
+        epoch, version = position
+        return [('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                 [('epoch', epoch), ('version', str(version))])]
+
+    def _transaction(self, statements):
+        try:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                for sql, params in statements:
+                    if isinstance(params, list):
+                        self._conn.executemany(sql, params)
+                    else:
+                        self._conn.execute(sql, params)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar entradas no SQLite: {e}")
+            return False
+
+    UPSERT = (
+        'INSERT INTO entries (id, date, dueDate, category, priority, completed, data)'
+        ' VALUES (?, ?, ?, ?, ?, ?, ?)'
+        ' ON CONFLICT(id) DO UPDATE SET date=excluded.date, dueDate=excluded.dueDate,'
+        ' category=excluded.category, priority=excluded.priority,'
+        ' completed=excluded.completed, data=excluded.data'
+    )
+
+    def set_position(self, epoch, version):
+        return self._transaction(self._position_statements((epoch, version)))
+
+    def write_all(self, entries, position=None):
+        return self._transaction([
+            ('DELETE FROM entries', ()),
+            (self.UPSERT, [self._row(entry) for entry in entries]),
+        ] + self._position_statements(position))
+
+    def write_records(self, records, all_entries, position=None):
+        statements = []
+        for record in records:
+            if record['op'] == 'put':
+                statements.append((self.UPSERT, self._row(record['entry'])))
+            else:
+                statements.append(('DELETE FROM entries WHERE id = ?', (str(record['id']),)))
+        return self._transaction(statements + self._position_statements(position))
+
+
+def migrate_json_to_sqlite(json_path, db_path):
+    """
+    Importa task-data.json (e o journal, se houver) para um banco SQLite novo.
+    O banco é montado em um arquivo temporário e só então renomeado, então
+    uma migração interrompida não deixa um banco pela metade.
+    """
+    entries = JsonBackend(json_path, journal=True).load()
+    tmp_path = f"{db_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    backend = SqliteBackend(tmp_path)
+    ok = backend.write_all(entries)
+    backend.close()
+    if not ok:
+        raise IOError(f'Erro ao migrar {json_path} para {db_path}')
+    os.replace(tmp_path, db_path)
+    return len(entries)
+
+
+def migrate_json_to_binary(json_path, snapshot_path):
+    """Converte task-data.json (e o journal, se houver) para o snapshot binário"""
+    entries = JsonBackend(json_path, journal=True).load()
+    write_snapshot(snapshot_path, entries)
+    return len(entries)
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da API de tarefas (app.py)
+
+Gera bases sintéticas no formato do task-data.json, exercita todas as rotas
+pelo test client do Flask e por um servidor HTTP local de verdade, e mostra
+vazão, latência p50/p99 e pico de memória (RSS) para cada tamanho de base.
+
+Exemplos:
+    python benchmark.py                          # 1k, 10k e 100k entradas
+    python benchmark.py --sizes 1000 500000 --seconds 10
+    python benchmark.py --save atual.json --baseline anterior.json
+    python benchmark.py --check-journal          # recuperação do journal após crash
+    STORAGE_BACKEND=sqlite python benchmark.py --sizes 100000
+
+Cada tamanho roda em um subprocesso próprio, para que o pico de memória
+medido seja só daquela base.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import string
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from datetime import date, datetime, timedelta
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIZES = [1000, 10000, 100000]
+ROUTES = ['list', 'get', 'put', 'delete', 'search', 'stats', 'bulk_post']
+
+WORDS = ('comprar pagar estudar ligar marcar responder limpar organizar revisar enviar '
+         'conta luz agua gas internet livro projeto java python relatorio reuniao '
+         'dentista médico academia música filme mercado presente viagem email '
+         'documento contrato faculdade prova trabalho plantas louça lixo carro').split()
+CATEGORIES = ['personal', 'work', 'study', 'health', 'shopping']
+PRIORITIES = ['low', 'medium', 'high']
+
+
+# --- Geração de dados ---
+
+def generate_entries(count, seed=42):
+    """Gera entradas no mesmo formato do task-data.json"""
+    rng = random.Random(seed)
+    start = date(2023, 1, 1)
+    entries = []
+    for i in range(count):
+        created = datetime(2023, 1, 1) + timedelta(seconds=rng.randrange(3 * 365 * 86400))
+        day = start + timedelta(days=rng.randrange(3 * 365))
+        due = day + timedelta(days=rng.randrange(-10, 60)) if rng.random() < 0.6 else None
+        suffix = ''.join(rng.choices(string.ascii_lowercase + string.digits, k=9))
+        entries.append({
+            'id': f"{int(created.timestamp() * 1000)}{i:06d}{suffix}",
+            'date': day.isoformat(),
+            'title': ' '.join(rng.choices(WORDS, k=rng.randint(1, 4))).capitalize(),
+            'content': ' '.join(rng.choices(WORDS, k=rng.choice([0, 0, 5, 20]))),
+            'completed': rng.random() < 0.4,
+            'priority': rng.choice(PRIORITIES),
+            'category': rng.choice(CATEGORIES),
+            'dueDate': due.isoformat() if due else '',
+            'createdAt': created.isoformat() + 'Z',
+            'updatedAt': created.isoformat() + 'Z',
+        })
+    return entries
+
+
+# --- Medição ---
+
+def peak_rss_mb():
+    """Pico de memória residente do processo, em MB"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa em KB, macOS em bytes
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except (ImportError, AttributeError):
+        return None
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies, elapsed):
+    return {
+        'requests': len(latencies),
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+
+class RequestPlan:
+    """
+    Gera a sequência de requisições (método, caminho, corpo) de cada rota.
+    Acompanha as remoções (get/put nunca pedem uma entrada já removida) e
+    pode ser usado por vários clientes em paralelo.
+    """
+
+    def __init__(self, entries, seed=7):
+        self.rng = random.Random(seed)
+        self.entries = entries
+        self._lock = threading.Lock()
+        self._reset_ids()
+
+    def _reset_ids(self):
+        """Todas as entradas existem de novo (início ou depois do bulk_post)"""
+        self.ids = [e['id'] for e in self.entries]
+        self._positions = {entry_id: i for i, entry_id in enumerate(self.ids)}
+        self.deletable = self.ids[:]
+        self.rng.shuffle(self.deletable)
+
+    def _discard(self, entry_id):
+        """Tira o id de self.ids em O(1), trocando-o com o último"""
+        i = self._positions.pop(entry_id)
+        last = self.ids.pop()
+        if last != entry_id:
+            self.ids[i] = last
+            self._positions[last] = i
+
+    def next(self, route):
+        """Próxima requisição da rota, ou None se não há mais o que pedir"""
+        with self._lock:
+            return self._next(route)
+
+    def _next(self, route):
+        if route == 'list':
+            return 'GET', '/api/entries', None
+        if route in ('get', 'put') and not self.ids:
+            return None
+        if route == 'get':
+            return 'GET', f"/api/entries/{self.rng.choice(self.ids)}", None
+        if route == 'put':
+            body = {'completed': self.rng.random() < 0.5, 'updatedAt': datetime.now().isoformat() + 'Z'}
+            return 'PUT', f"/api/entries/{self.rng.choice(self.ids)}", body
+        if route == 'delete':
+            if not self.deletable:
+                return None
+            entry_id = self.deletable.pop()
+            self._discard(entry_id)
+            return 'DELETE', f"/api/entries/{entry_id}", None
+        if route == 'search':
+            return 'GET', f"/api/search?q={urllib.parse.quote(self.rng.choice(WORDS))}", None
+        if route == 'stats':
+            return 'GET', '/api/stats', None
+        if route == 'bulk_post':
+            self._reset_ids()   # a lista inteira volta, inclusive as removidas
+            return 'POST', '/api/entries', self.entries
+        raise ValueError(route)
+
+
+def run_route(send, plan, route, max_requests, max_seconds):
+    """Executa uma rota até max_requests ou max_seconds (pelo menos uma vez)"""
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < max_requests:
+        request = plan.next(route)
+        if request is None:
+            break
+        method, path, body = request
+        t0 = time.perf_counter()
+        status = send(method, path, body)
+        latencies.append(time.perf_counter() - t0)
+        if status >= 400:
+            raise RuntimeError(f"{method} {path} respondeu {status}")
+        if time.perf_counter() - started >= max_seconds:
+            break
+    return summarize(latencies, time.perf_counter() - started)
+
+
+# --- Clientes ---
+
+def test_client_sender(app):
+    client = app.test_client()
+
+    def send(method, path, body):
+        response = client.open(path, method=method, json=body)
+        response.get_data()
+        return response.status_code
+    return send
+
+
+def http_sender(host, port):
+    local = threading.local()
+
+    def send(method, path, body):
+        conn = getattr(local, 'conn', None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection(host, port, timeout=300)
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload is not None else {}
+        conn.request(method, path, body=payload, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    return send
+
+
+def run_concurrent(send, plan, route, max_requests, max_seconds, concurrency):
+    """Vários clientes HTTP em paralelo; a vazão é a soma de todos"""
+    if concurrency <= 1:
+        return run_route(send, plan, route, max_requests, max_seconds)
+    results = []
+    lock = threading.Lock()
+
+    def worker():
+        result = run_route(send, plan, route, max(1, max_requests // concurrency), max_seconds)
+        with lock:
+            results.append(result)
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    total = sum(r['requests'] for r in results)
+    return {
+        'requests': total,
+        'throughput': total / elapsed if elapsed else 0.0,
+        'p50_ms': max(r['p50_ms'] for r in results),
+        'p99_ms': max(r['p99_ms'] for r in results),
+    }
+
+
+# --- Execução de um tamanho (subprocesso) ---
+
+def run_one(size, args):
+    workdir = tempfile.mkdtemp(prefix='bench-tarefas-')
+    try:
+        entries = generate_entries(size)
+        with open(os.path.join(workdir, 'task-data.json'), 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False, indent=2)
+
+        # app.py usa caminhos relativos ao diretório atual; o arquivamento
+        # automático mudaria a base no meio da medição
+        os.chdir(workdir)
+        os.environ.setdefault('ARCHIVE_AFTER_DAYS', '0')
+        sys.path.insert(0, ROOT)
+        t0 = time.perf_counter()
+        import app as app_module
+        app_module.store.refresh()
+        load_seconds = time.perf_counter() - t0
+
+        result = {'size': size, 'load_seconds': load_seconds, 'test_client': {}, 'http': {}}
+        plan = RequestPlan(entries)
+        send = test_client_sender(app_module.app)
+        for route in args.routes:
+            result['test_client'][route] = run_route(send, plan, route, args.requests, args.seconds)
+
+        if not args.skip_http:
+            from werkzeug.serving import make_server
+            server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            send = http_sender('127.0.0.1', server.server_port)
+            for route in args.routes:
+                result['http'][route] = run_concurrent(send, plan, route, args.requests,
+                                                       args.seconds, args.concurrency)
+            server.shutdown()
+
+        result['peak_rss_mb'] = peak_rss_mb()
+        return result
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# --- Verificação do journal ---
+
+def check_journal_recovery():
+    """
+    Regressão do modo journal: um crash no meio do append deixa a última
+    linha pela metade; a escrita seguinte (já confirmada) não pode se
+    perder junto com ela. Retorna a lista de problemas encontrados.
+    """
+    sys.path.insert(0, ROOT)
+    from backends import JsonBackend
+
+    problems = []
+    workdir = tempfile.mkdtemp(prefix='bench-journal-')
+    try:
+        path = os.path.join(workdir, 'task-data.json')
+        backend = JsonBackend(path, journal=True)
+        backend.write_all([{'id': 'a'}, {'id': 'b'}])
+        with open(backend.journal_path, 'a', encoding='utf-8') as f:
+            f.write('{"op": "put", "id": "c", "ent')   # append interrompido
+        with backend.lock:
+            backend.load()
+        if not backend.write_records([{'op': 'put', 'id': 'd', 'entry': {'id': 'd'}}], None):
+            problems.append('write_records falhou depois do registro incompleto')
+        ids = sorted(str(e['id']) for e in JsonBackend(path, journal=True).load())
+        if ids != ['a', 'b', 'd']:
+            problems.append(f"entradas após recarregar: {ids} (esperado ['a', 'b', 'd'])")
+        with open(backend.journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'op': 'mark', 'token': 'x'}) + '\n')
+        applied = backend._replay_journal(backend.journal_path, {})
+        if applied != 1:
+            problems.append(f"journal com 1 alteração e 1 marca contou {applied}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return problems
+
+
+# --- Relatório ---
+
+def print_report(results):
+    for result in results:
+        rss = result['peak_rss_mb']
+        rss_text = f"{rss:.0f} MB" if rss is not None else 'n/d'
+        print(f"\n=== {result['size']} entradas | carga inicial {result['load_seconds']:.2f}s | pico RSS {rss_text} ===")
+        print(f"{'rota':<12}{'cliente':<13}{'req':>7}{'req/s':>11}{'p50 ms':>10}{'p99 ms':>10}")
+        for mode in ('test_client', 'http'):
+            for route, stats in result[mode].items():
+                print(f"{route:<12}{mode:<13}{stats['requests']:>7}{stats['throughput']:>11.1f}"
+                      f"{stats['p50_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+
+
+def compare_with_baseline(results, baseline_path, max_regression):
+    """Retorna a lista de regressões de p50 acima do limite em relação à base"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {r['size']: r for r in json.load(f)}
+    regressions = []
+    for result in results:
+        previous = baseline.get(result['size'])
+        if previous is None:
+            continue
+        for mode in ('test_client', 'http'):
+            for route, stats in result[mode].items():
+                before = previous.get(mode, {}).get(route)
+                if not before or not before['p50_ms']:
+                    continue
+                change = stats['p50_ms'] / before['p50_ms'] - 1
+                if change > max_regression:
+                    regressions.append(f"{result['size']} {mode} {route}: p50 "
+                                       f"{before['p50_ms']:.2f}ms -> {stats['p50_ms']:.2f}ms (+{change:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da API de tarefas')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='tamanhos das bases sintéticas')
+    parser.add_argument('--routes', nargs='+', default=ROUTES, choices=ROUTES)
+    parser.add_argument('--requests', type=int, default=200, help='máximo de requisições por rota')
+    parser.add_argument('--seconds', type=float, default=5.0, help='tempo máximo por rota')
+    parser.add_argument('--concurrency', type=int, default=1, help='clientes HTTP em paralelo')
+    parser.add_argument('--skip-http', action='store_true', help='usar só o test client')
+    parser.add_argument('--save', help='salva os resultados em JSON')
+    parser.add_argument('--baseline', help='resultados anteriores (JSON) para comparar')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help='piora máxima aceita no p50 em relação à base (0.25 = 25%%)')
+    parser.add_argument('--check-journal', action='store_true',
+                        help='só verifica a recuperação do journal após um crash e sai')
+    parser.add_argument('--run-one', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.check_journal:
+        problems = check_journal_recovery()
+        for problem in problems:
+            print(f"FALHA: {problem}")
+        if problems:
+            sys.exit(1)
+        print("Journal: registro incompleto descartado sem perder a escrita seguinte.")
+        return
+
+    if args.run_one is not None:
+        print(json.dumps(run_one(args.run_one, args)))
+        return
+
+    results = []
+    for size in args.sizes:
+        print(f"Rodando com {size} entradas...", file=sys.stderr)
+        command = [sys.executable, os.path.abspath(__file__), '--run-one', str(size),
+                   '--requests', str(args.requests), '--seconds', str(args.seconds),
+                   '--concurrency', str(args.concurrency), '--routes', *args.routes]
+        if args.skip_http:
+            command.append('--skip-http')
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(completed.stderr, file=sys.stderr)
+            print(f"Falha ao rodar com {size} entradas (código {completed.returncode}).", file=sys.stderr)
+            sys.exit(1)
+        output = completed.stdout
+        # O app imprime mensagens próprias; o resultado é a última linha
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print_report(results)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResultados salvos em: {args.save}")
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.max_regression)
+        if regressions:
+            print("\nREGRESSÕES:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nSem regressões em relação à base.")
+
+
+if __name__ == '__main__':
+    main()
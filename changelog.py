@@ -0,0 +1,91 @@
+import itertools
+import threading
+import time
+from collections import deque
+
+
+class ChangeLog:
+    """
+    Histórico recente de alterações, mantido pelo EntryStore. Cada
+    alteração de entrada avança a versão; os clientes pedem "mudanças desde
+    a versão N" em vez da lista inteira.
+
+    Época e versão vêm do store (position()), que as grava no backend: são
+    as mesmas em todos os workers, então o cliente pode continuar de onde
+    parou em qualquer um deles. As alterações de uma mesma escrita levam a
+    versão em que ela terminou. Uma substituição completa (POST da lista
+    inteira ou arquivo editado por fora) troca a época: versões de épocas
+    anteriores não valem mais e o cliente precisa baixar tudo de novo.
+    """
+
+    def __init__(self, position, max_changes=10000):
+        self._position = position
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)   # acorda /api/entries/events
+        self._changes = deque(maxlen=max_changes)
+        self._floor = 0          # versões anteriores a esta não estão no histórico
+        self.epoch = None
+        self.version = 0
+        self.changed_at = None   # horário da última alteração (Last-Modified)
+        self.reset([])
+
+    # --- Manutenção (chamado pelo store) ---
+
+    def reset(self, entries):
+        epoch, version = self._position()
+        with self._lock:
+            self.epoch = epoch
+            self.version = self._floor = version
+            self.changed_at = time.time()
+            self._changes.clear()
+            self._changed.notify_all()
+
+    def apply(self, old, new):
+        self.apply_many([(old, new)])
+
+    def apply_many(self, changes):
+        """Registra as alterações de uma escrita de uma vez (nunca só parte delas)"""
+        _, version = self._position()
+        with self._lock:
+            self.changed_at = time.time()
+            for old, new in changes:
+                # Uma atualização que troca o id vira remoção do id antigo + criação
+                if old is not None and (new is None or str(new['id']) != str(old['id'])):
+                    self._append({'version': version, 'op': 'delete', 'id': str(old['id'])})
+                if new is not None:
+                    self._append({'version': version, 'op': 'put', 'id': str(new['id']), 'entry': new})
+            self.version = version
+            self._changed.notify_all()
+
+    def _append(self, change):
+        if len(self._changes) == self._changes.maxlen:
+            self._floor = self._changes[0]['version']
+        self._changes.append(change)
+
+    # --- Consulta ---
+
+    def position(self):
+        """(época, versão) atuais, lidas juntas"""
+        with self._lock:
+            return self.epoch, self.version
+
+    def wait(self, epoch, version, timeout):
+        """
+        Espera até haver algo posterior a (época, versão) ou o timeout.
+        Retorna True se houve alteração.
+        """
+        with self._changed:
+            return self._changed.wait_for(lambda: self.epoch != epoch or self.version > version, timeout)
+
+    def since(self, epoch, version):
+        """
+        Retorna as alterações posteriores à versão informada, ou None se
+        elas não estão mais disponíveis (outra época ou histórico descartado).
+        """
+        with self._lock:
+            if epoch != self.epoch or version > self.version or version < self._floor:
+                return None
+            newer = list(itertools.takewhile(lambda change: change['version'] > version,
+                                             reversed(self._changes)))
+            newer.reverse()
+            return newer
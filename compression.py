@@ -0,0 +1,115 @@
+import gzip
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+
+try:
+    import brotli  # opcional: pip install brotli
+except ImportError:
+    brotli = None
+
+# Respostas menores que isso não compensam a compressão
+MIN_SIZE = 1024
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+# Qualidade do brotli: as respostas da API são comprimidas na thread da
+# requisição a cada versão nova, então usam um nível rápido; os arquivos
+# estáticos são comprimidos uma vez e podem usar o máximo
+BROTLI_QUALITY = 5
+BROTLI_STATIC_QUALITY = 11
+# Só os arquivos da interface ficam em memória (não task-data.json etc.)
+STATIC_EXTENSIONS = ('.html', '.css', '.js', '.svg')
+
+
+def choose_encoding(accept_encoding):
+    """Escolhe br ou gzip de acordo com o Accept-Encoding do cliente"""
+    if brotli is not None and 'br' in accept_encoding:
+        return 'br'
+    if 'gzip' in accept_encoding:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding, static=False):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_STATIC_QUALITY if static else BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=6)
+
+
+def is_compressible(mimetype):
+    return bool(mimetype) and mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressedCache:
+    """
+    Guarda corpos já comprimidos, chaveados por (ETag, encoding), para que
+    a mesma versão de uma resposta seja comprimida uma única vez.
+    """
+
+    def __init__(self, max_items=64):
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+        self.max_items = max_items
+
+    def get_or_compress(self, key, data, encoding):
+        with self._lock:
+            body = self._items.get((key, encoding))
+            if body is not None:
+                self._items.move_to_end((key, encoding))
+                return body
+        body = compress(data, encoding)
+        with self._lock:
+            self._items[(key, encoding)] = body
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return body
+
+
+class StaticFiles:
+    """
+    Arquivos estáticos da interface (STATIC_EXTENSIONS) lidos uma vez e
+    mantidos em memória já comprimidos (gzip e, se disponível, brotli). O
+    conteúdo é relido quando o mtime ou o tamanho do arquivo muda; passando
+    de max_files arquivos, os novos são servidos direto do disco.
+    """
+
+    def __init__(self, max_files=64):
+        self._lock = threading.Lock()
+        self._files = {}   # caminho -> dict com assinatura, corpo e variantes
+        self.max_files = max_files
+
+    def get(self, path):
+        """Retorna o arquivo em cache, ou None se não deve ser servido daqui"""
+        if not path.lower().endswith(STATIC_EXTENSIONS):
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if not is_compressible(mimetype):
+            return None
+        signature = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._files.get(path)
+            if cached is not None and cached['signature'] == signature:
+                return cached
+            if cached is None and len(self._files) >= self.max_files:
+                return None
+        with open(path, 'rb') as f:
+            data = f.read()
+        variants = {'identity': data}
+        if len(data) >= MIN_SIZE:
+            variants['gzip'] = compress(data, 'gzip', static=True)
+            if brotli is not None:
+                variants['br'] = compress(data, 'br', static=True)
+        cached = {
+            'signature': signature,
+            'mtime': st.st_mtime,
+            'mimetype': mimetype,
+            'etag': f"{st.st_mtime_ns:x}-{st.st_size:x}",
+            'variants': variants,
+        }
+        with self._lock:
+            self._files[path] = cached
+        return cached
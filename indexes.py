@@ -0,0 +1,132 @@
+import bisect
+import threading
+
+
+class EntryIndexes:
+    """
+    Índices secundários sobre as entradas, mantidos pelo EntryStore.
+    - igualdade: category, priority, completed (valor -> conjunto de ids)
+    - intervalo: date, dueDate (lista ordenada de (valor, id))
+    - ids ordenados, para paginação por cursor (?after=<id>)
+    O índice primário por id é o próprio dicionário do store.
+    """
+
+    EQUALITY_FIELDS = ('category', 'priority', 'completed')
+    RANGE_FIELDS = ('date', 'dueDate')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._equality = {}
+        self._ranges = {}
+        self._ids = []
+        self.reset([])
+
+    # --- Manutenção (chamado pelo store) ---
+
+    def reset(self, entries):
+        with self._lock:
+            self._equality = {field: {} for field in self.EQUALITY_FIELDS}
+            self._ranges = {field: [] for field in self.RANGE_FIELDS}
+            self._ids = []
+            for entry in entries:
+                self._add(entry, sorted_insert=False)
+            for items in self._ranges.values():
+                items.sort()
+            self._ids.sort()
+
+    def apply(self, old, new):
+        with self._lock:
+            if old is not None:
+                self._remove(old)
+            if new is not None:
+                self._add(new)
+
+    def _add(self, entry, sorted_insert=True):
+        entry_id = str(entry['id'])
+        if sorted_insert:
+            bisect.insort(self._ids, entry_id)
+        else:
+            self._ids.append(entry_id)
+        for field in self.EQUALITY_FIELDS:
+            value = self._equality_value(entry, field)
+            self._equality[field].setdefault(value, set()).add(entry_id)
+        for field in self.RANGE_FIELDS:
+            value = entry.get(field) or ''
+            if not value:
+                continue  # dueDate vazio não entra em consultas por intervalo
+            if sorted_insert:
+                bisect.insort(self._ranges[field], (value, entry_id))
+            else:
+                self._ranges[field].append((value, entry_id))
+
+    def _remove(self, entry):
+        entry_id = str(entry['id'])
+        i = bisect.bisect_left(self._ids, entry_id)
+        if i < len(self._ids) and self._ids[i] == entry_id:
+            del self._ids[i]
+        for field in self.EQUALITY_FIELDS:
+            value = self._equality_value(entry, field)
+            ids = self._equality[field].get(value)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._equality[field][value]
+        for field in self.RANGE_FIELDS:
+            value = entry.get(field) or ''
+            if not value:
+                continue
+            items = self._ranges[field]
+            i = bisect.bisect_left(items, (value, entry_id))
+            if i < len(items) and items[i] == (value, entry_id):
+                del items[i]
+
+    @staticmethod
+    def _equality_value(entry, field):
+        if field == 'completed':
+            return bool(entry.get('completed', False))
+        return entry.get(field)
+
+    # --- Consultas ---
+
+    def query(self, equals=None, ranges=None):
+        """
+        Retorna o conjunto de ids que satisfaz todos os filtros.
+        equals: {campo: valor}
+        ranges: {campo: (mínimo ou None, máximo ou None)}, ambos inclusivos
+        """
+        with self._lock:
+            candidates = []
+            for field, value in (equals or {}).items():
+                candidates.append(self._equality[field].get(value, set()))
+            for field, (low, high) in (ranges or {}).items():
+                candidates.append(self._range_ids(field, low, high))
+            if not candidates:
+                return set()
+            # Intersecta a partir do menor conjunto
+            candidates.sort(key=len)
+            result = set(candidates[0])
+            for ids in candidates[1:]:
+                result &= ids
+                if not result:
+                    break
+            return result
+
+    def page(self, after=None, limit=None, ids=None):
+        """
+        Retorna (ids da página, cursor da próxima página ou None) em ordem de id.
+        Sem `ids` pagina todas as entradas; com `ids` (resultado de query) pagina só elas.
+        """
+        with self._lock:
+            ordered = self._ids if ids is None else sorted(ids)
+            start = bisect.bisect_right(ordered, after) if after else 0
+            end = len(ordered) if limit is None else start + limit
+            page_ids = ordered[start:end]
+        next_cursor = page_ids[-1] if end < len(ordered) and page_ids else None
+        return page_ids, next_cursor
+
+    def _range_ids(self, field, low, high):
+        items = self._ranges[field]
+        start = bisect.bisect_left(items, (low,)) if low else 0
+        # '\uffff' ordena depois de qualquer id, tornando o máximo inclusivo
+        end = bisect.bisect_right(items, (high, '\uffff')) if high else len(items)
+        return {entry_id for _, entry_id in items[start:end]}
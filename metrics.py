@@ -0,0 +1,163 @@
+import bisect
+import threading
+import time
+
+# Limites (em segundos) dos histogramas de latência
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Contagens cumulativas por faixa, como o histograma do Prometheus"""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)   # a última faixa é +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, buckets, value):
+        self.counts[bisect.bisect_left(buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """
+    Métricas do servidor no formato de texto do Prometheus (/api/metrics).
+
+    Registrar uma observação custa um lock e algumas somas; a formatação
+    do texto só acontece quando alguém lê o endpoint.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._requests = {}     # (método, rota, status) -> total
+        self._latency = {}      # (método, rota) -> Histogram
+        self._stages = {}       # (método, rota, etapa) -> segundos somados
+        self._sizes = {}        # (direção, método, rota) -> [bytes, requisições]
+        self._storage = {}      # operação -> Histogram
+
+    # --- Registro ---
+
+    def observe_request(self, method, route, status, seconds, stages, request_bytes, response_bytes):
+        with self._lock:
+            key = (method, route, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            histogram = self._latency.get((method, route))
+            if histogram is None:
+                histogram = self._latency[(method, route)] = Histogram(self.buckets)
+            histogram.observe(self.buckets, seconds)
+            for stage, spent in stages.items():
+                key = (method, route, stage)
+                self._stages[key] = self._stages.get(key, 0.0) + spent
+            for direction, size in (('request', request_bytes), ('response', response_bytes)):
+                if size is None:   # respostas em stream não têm tamanho conhecido
+                    continue
+                totals = self._sizes.setdefault((direction, method, route), [0, 0])
+                totals[0] += size
+                totals[1] += 1
+
+    def observe_storage(self, operation, seconds):
+        with self._lock:
+            histogram = self._storage.get(operation)
+            if histogram is None:
+                histogram = self._storage[operation] = Histogram(self.buckets)
+            histogram.observe(self.buckets, seconds)
+
+    # --- Exposição ---
+
+    def render(self, gauges=()):
+        """
+        Texto no formato de exposição do Prometheus. gauges é uma lista de
+        (nome, ajuda, valor) calculados na hora da leitura.
+        """
+        with self._lock:
+            requests = dict(self._requests)
+            latency = {key: (list(h.counts), h.sum, h.count) for key, h in self._latency.items()}
+            stages = dict(self._stages)
+            sizes = {key: tuple(totals) for key, totals in self._sizes.items()}
+            storage = {key: (list(h.counts), h.sum, h.count) for key, h in self._storage.items()}
+
+        lines = []
+        self._header(lines, 'http_requests_total', 'counter', 'Requisições atendidas por rota e status')
+        for (method, route, status), total in sorted(requests.items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {total}")
+
+        self._header(lines, 'http_request_duration_seconds', 'histogram', 'Latência das requisições')
+        for (method, route), histogram in sorted(latency.items()):
+            self._histogram(lines, 'http_request_duration_seconds', histogram, method=method, route=route)
+
+        self._header(lines, 'http_request_stage_seconds_total', 'counter',
+                     'Tempo gasto por etapa: json_load, json_dump e handler (o restante)')
+        for (method, route, stage), spent in sorted(stages.items()):
+            lines.append(f"http_request_stage_seconds_total"
+                         f"{_labels(method=method, route=route, stage=stage)} {spent:.6f}")
+
+        for direction, help_text in (('request', 'Tamanho do corpo das requisições'),
+                                     ('response', 'Tamanho do corpo das respostas')):
+            name = f"http_{direction}_size_bytes"
+            self._header(lines, name, 'summary', help_text)
+            for (kind, method, route), (total, count) in sorted(sizes.items()):
+                if kind != direction:
+                    continue
+                labels = _labels(method=method, route=route)
+                lines.append(f"{name}_sum{labels} {total}")
+                lines.append(f"{name}_count{labels} {count}")
+
+        self._header(lines, 'storage_operation_duration_seconds', 'histogram',
+                     'Latência das leituras e gravações do backend')
+        for operation, histogram in sorted(storage.items()):
+            self._histogram(lines, 'storage_operation_duration_seconds', histogram, operation=operation)
+
+        for name, help_text, value in gauges:
+            self._header(lines, name, 'gauge', help_text)
+            lines.append(f"{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _header(lines, name, kind, help_text):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    def _histogram(self, lines, name, histogram, **labels):
+        counts, total, count = histogram
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+            cumulative += bucket_count
+            lines.append(f"{name}_bucket{_labels(**labels, le=str(bound))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(**labels)} {total:.6f}")
+        lines.append(f"{name}_count{_labels(**labels)} {count}")
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels.items()) + '}'
+
+
+class TimedBackend:
+    """
+    Envolve um backend (backends.py) medindo o tempo de leitura e gravação;
+    todo o resto é repassado ao backend original.
+    """
+
+    TIMED = ('load', 'write_all', 'write_records', 'begin_compaction', 'finish_compaction')
+
+    def __init__(self, backend, metrics):
+        self._backend = backend
+        self._metrics = metrics
+
+    def __getattr__(self, name):
+        attr = getattr(self._backend, name)
+        if name not in self.TIMED:
+            return attr
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                self._metrics.observe_storage(name, time.perf_counter() - started)
+        return timed
@@ -3,17 +3,56 @@
 """
 Script de Busca de Texto em Páginas Web
 Permite buscar texto específico na estrutura HTML de qualquer página web
+
+Modo em lote (várias URLs, sem perguntas):
+    python text_searcher.py --urls lista.txt -t "Python" -t "Django"
+    type lista.txt | python text_searcher.py --urls - -t "Python" --saida resultado.json
 """
 import requests
 from bs4 import BeautifulSoup
+import argparse
+import json
 import sys
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse
 from colorama import Fore, Style, init
 
 # Inicializar colorama para Windows
 init(autoreset=True)
 
+
+class HostLimiter:
+    """
+    Limita as requisições por host no modo em lote: no máximo
+    `max_por_host` conexões simultâneas e um intervalo mínimo (em segundos)
+    entre o início de duas requisições ao mesmo host.
+    """
+
+    def __init__(self, max_por_host=2, intervalo=0.5):
+        self.max_por_host = max_por_host
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._semaforos = {}
+        self._proxima = {}  # host -> quando a próxima requisição pode começar
+
+    @contextmanager
+    def reservar(self, host):
+        with self._lock:
+            semaforo = self._semaforos.setdefault(host, threading.Semaphore(self.max_por_host))
+        with semaforo:
+            with self._lock:
+                agora = time.monotonic()
+                inicio = max(agora, self._proxima.get(host, 0.0))
+                self._proxima[host] = inicio + self.intervalo
+            if inicio > agora:
+                time.sleep(inicio - agora)
+            yield
+
 class TextSearcher:
     def __init__(self):
         self.headers = {
@@ -61,49 +100,45 @@ class TextSearcher:
         """Faz a requisição HTTP e retorna o conteúdo da página"""
         try:
             print(f"\n{Fore.BLUE}🌐 Acessando a página...")
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+            html_content, is_html = self.baixar_pagina(url)
             
             # Verificar se é HTML
-            content_type = response.headers.get('content-type', '').lower()
-            if 'html' not in content_type:
+            if not is_html:
                 print(f"{Fore.RED}⚠️  Aviso: Esta página pode não ser HTML puro.")
             
             # Verificar se é uma página dinâmica/SPA
-            self.verificar_pagina_dinamica(response.text, url)
+            self.verificar_pagina_dinamica(html_content, url)
             
             print(f"{Fore.GREEN}✅ Página carregada com sucesso!")
-            return response.text
+            return html_content
             
         except requests.exceptions.RequestException as e:
             print(f"{Fore.RED}❌ Erro ao acessar a página: {e}")
             return None
     
+    def baixar_pagina(self, url):
+        """Baixa a página (sem mensagens); retorna (html, é_html). Erros de rede sobem como exceção"""
+        response = self.session.get(url, timeout=15)
+        response.raise_for_status()
+        content_type = response.headers.get('content-type', '').lower()
+        return response.text, 'html' in content_type
+    
     def buscar_texto_na_pagina(self, html_content, texto_busca, case_sensitive=False):
         """Busca o texto na estrutura HTML e retorna os resultados"""
         print(f"\n{Fore.BLUE}🔍 Analisando estrutura HTML...")
-        
+        return self.buscar_termos(html_content, [texto_busca], case_sensitive)[texto_busca]
+    
+    def buscar_termos(self, html_content, termos, case_sensitive=False):
+        """
+        Busca vários termos na mesma página: o HTML é dividido em linhas e
+        processado pelo BeautifulSoup uma vez só, para todos os termos.
+        Retorna {termo: (resultados, ocorrências no texto visível)}
+        """
         # Dividir HTML em linhas para análise
         linhas_html = html_content.splitlines()
-        resultados = []
         
         # Configurar padrão de busca
         flags = 0 if case_sensitive else re.IGNORECASE
-        padrao = re.escape(texto_busca)
-        
-        # Buscar em cada linha
-        for num_linha, linha in enumerate(linhas_html, 1):
-            if re.search(padrao, linha, flags):
-                # Extrair contexto e elemento HTML
-                contexto = self.extrair_contexto(linha, texto_busca, case_sensitive)
-                elemento = self.identificar_elemento_html(linha)
-                
-                resultados.append({
-                    'linha': num_linha,
-                    'conteudo_linha': linha.strip(),
-                    'contexto': contexto,
-                    'elemento': elemento
-                })
         
         # Também buscar no texto visível da página
         try:
@@ -113,7 +148,29 @@ class TextSearcher:
             print(f"{Fore.YELLOW}⚠️ Aviso: Erro ao processar HTML para texto visível: {e}")
             texto_visivel = ""
         
-        return resultados, self.contar_ocorrencias_visiveis(texto_visivel, texto_busca, case_sensitive)
+        por_termo = {}
+        for texto_busca in termos:
+            padrao = re.compile(re.escape(texto_busca), flags)
+            resultados = []
+            
+            # Buscar em cada linha
+            for num_linha, linha in enumerate(linhas_html, 1):
+                if padrao.search(linha):
+                    # Extrair contexto e elemento HTML
+                    contexto = self.extrair_contexto(linha, texto_busca, case_sensitive)
+                    elemento = self.identificar_elemento_html(linha)
+                    
+                    resultados.append({
+                        'linha': num_linha,
+                        'conteudo_linha': linha.strip(),
+                        'contexto': contexto,
+                        'elemento': elemento
+                    })
+            
+            por_termo[texto_busca] = (
+                resultados, self.contar_ocorrencias_visiveis(texto_visivel, texto_busca, case_sensitive)
+            )
+        return por_termo
     
     def extrair_contexto(self, linha, texto_busca, case_sensitive):
         """Extrai o contexto ao redor do texto encontrado"""
@@ -295,6 +352,23 @@ class TextSearcher:
     
     def verificar_pagina_dinamica(self, html_content, url):
         """Verifica se a página é dinâmica/SPA e exibe aviso"""
+        site, indicadores_encontrados = self.detectar_pagina_dinamica(html_content, url)
+        
+        # Verificar se é um site conhecido como dinâmico
+        if site:
+            print(f"{Fore.YELLOW}⚠️  AVISO: Esta página ({site}) é conhecida por ser dinâmica.")
+            print(f"{Fore.YELLOW}   O conteúdo pode ser carregado via JavaScript após o carregamento inicial.")
+            print(f"{Fore.YELLOW}   Os resultados podem não refletir todo o conteúdo visível ao usuário.")
+            return
+        
+        if indicadores_encontrados:
+            print(f"{Fore.YELLOW}⚠️  AVISO: Esta página parece ser dinâmica/SPA.")
+            print(f"{Fore.YELLOW}   Indicadores encontrados: {', '.join(indicadores_encontrados[:3])}...")
+            print(f"{Fore.YELLOW}   O conteúdo pode ser carregado via JavaScript após o carregamento inicial.")
+            print(f"{Fore.YELLOW}   Para páginas como esta, considere usar ferramentas específicas de scraping como Selenium, Playwright ou Puppeteer")
+    
+    def detectar_pagina_dinamica(self, html_content, url):
+        """Retorna (site dinâmico conhecido ou None, indicadores de SPA encontrados no HTML)"""
         indicadores_dinamicos = [
             'react', 'angular', 'vue.js', 'next.js', 'nuxt',
             'app.js', 'bundle.js', 'main.js', 'runtime.js',
@@ -312,25 +386,162 @@ class TextSearcher:
         html_lower = html_content.lower()
         url_lower = url.lower()
         
-        # Verificar se é um site conhecido como dinâmico
         for site in sites_dinamicos:
             if site in url_lower:
-                print(f"{Fore.YELLOW}⚠️  AVISO: Esta página ({site}) é conhecida por ser dinâmica.")
-                print(f"{Fore.YELLOW}   O conteúdo pode ser carregado via JavaScript após o carregamento inicial.")
-                print(f"{Fore.YELLOW}   Os resultados podem não refletir todo o conteúdo visível ao usuário.")
-                return
+                return site, []
         
         # Verificar indicadores de páginas dinâmicas no HTML
         indicadores_encontrados = []
         for indicador in indicadores_dinamicos:
             if indicador in html_lower:
                 indicadores_encontrados.append(indicador)
-        
-        if indicadores_encontrados:
-            print(f"{Fore.YELLOW}⚠️  AVISO: Esta página parece ser dinâmica/SPA.")
-            print(f"{Fore.YELLOW}   Indicadores encontrados: {', '.join(indicadores_encontrados[:3])}...")
-            print(f"{Fore.YELLOW}   O conteúdo pode ser carregado via JavaScript após o carregamento inicial.")
-            print(f"{Fore.YELLOW}   Para páginas como esta, considere usar ferramentas específicas de scraping como Selenium, Playwright ou Puppeteer")
+        return None, indicadores_encontrados
+    
+    # --- Modo em lote ---
+    
+    def ler_urls(self, origem):
+        """
+        Lê as URLs de um arquivo (uma por linha, # para comentários) ou da
+        entrada padrão se origem for '-'. Retorna (válidas, inválidas), sem
+        repetições.
+        """
+        if origem == '-':
+            linhas = sys.stdin.read().splitlines()
+        else:
+            with open(origem, 'r', encoding='utf-8') as f:
+                linhas = f.read().splitlines()
+        validas, invalidas = [], []
+        for linha in linhas:
+            url = linha.strip()
+            if not url or url.startswith('#') or url in validas:
+                continue
+            (validas if self.validar_url(url) else invalidas).append(url)
+        return validas, invalidas
+    
+    def intercalar_por_host(self, urls):
+        """
+        Reordena as URLs alternando os hosts, para que as threads não fiquem
+        todas esperando o limite do mesmo site enquanto outros estão livres.
+        """
+        por_host = {}
+        for url in urls:
+            por_host.setdefault(urlparse(url).netloc.lower(), []).append(url)
+        filas = list(por_host.values())
+        intercaladas = []
+        for i in range(max((len(fila) for fila in filas), default=0)):
+            intercaladas.extend(fila[i] for fila in filas if i < len(fila))
+        return intercaladas
+    
+    def processar_url(self, url, termos, case_sensitive, limitador):
+        """Baixa uma página (respeitando o limite do host) e busca todos os termos nela"""
+        pagina = {'url': url, 'erro': None, 'html': True, 'dinamica': None, 'segundos': 0.0, 'termos': {}}
+        inicio = time.perf_counter()
+        try:
+            with limitador.reservar(urlparse(url).netloc.lower()):
+                html_content, pagina['html'] = self.baixar_pagina(url)
+        except requests.exceptions.RequestException as e:
+            pagina['erro'] = str(e)
+            pagina['segundos'] = time.perf_counter() - inicio
+            return pagina
+        
+        site, indicadores = self.detectar_pagina_dinamica(html_content, url)
+        if site or indicadores:
+            pagina['dinamica'] = site or indicadores[:3]
+        for termo, (resultados, visiveis) in self.buscar_termos(html_content, termos, case_sensitive).items():
+            pagina['termos'][termo] = {
+                'ocorrencias_html': len(resultados),
+                'ocorrencias_visiveis': visiveis,
+                'resultados': resultados
+            }
+        pagina['segundos'] = time.perf_counter() - inicio
+        return pagina
+    
+    def executar_lote(self, urls, termos, case_sensitive=False, max_workers=8, max_por_host=2, intervalo=0.5):
+        """
+        Busca os termos em todas as URLs em paralelo, com até `max_workers`
+        downloads ao mesmo tempo e o limite por host do HostLimiter. As
+        conexões são reaproveitadas pela self.session (keep-alive por host).
+        Retorna o relatório com as páginas e os totais por termo.
+        """
+        # Pool de conexões do tamanho do número de threads, por host
+        adaptador = HTTPAdapter(pool_connections=max(10, max_workers), pool_maxsize=max_workers)
+        self.session.mount('http://', adaptador)
+        self.session.mount('https://', adaptador)
+        limitador = HostLimiter(max_por_host, intervalo)
+        
+        print(f"{Fore.BLUE}🌐 Buscando {len(termos)} termo(s) em {len(urls)} página(s) "
+              f"({max_workers} em paralelo, até {max_por_host} por host)...")
+        inicio = time.perf_counter()
+        paginas = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futuros = [executor.submit(self.processar_url, url, termos, case_sensitive, limitador)
+                       for url in self.intercalar_por_host(urls)]
+            for n, futuro in enumerate(as_completed(futuros), 1):
+                pagina = futuro.result()
+                paginas.append(pagina)
+                prefixo = f"[{n}/{len(urls)}]"
+                if pagina['erro']:
+                    print(f"{Fore.RED}{prefixo} ❌ {pagina['url']}: {pagina['erro']}")
+                else:
+                    contagens = ', '.join(f"'{t}': {r['ocorrencias_html']}/{r['ocorrencias_visiveis']}"
+                                          for t, r in pagina['termos'].items())
+                    aviso = f" {Fore.YELLOW}(dinâmica)" if pagina['dinamica'] else ""
+                    print(f"{Fore.GREEN}{prefixo} ✅ {pagina['url']} {Fore.WHITE}{contagens}{aviso}")
+        
+        # Mesma ordem da lista de entrada no relatório
+        ordem = {url: i for i, url in enumerate(urls)}
+        paginas.sort(key=lambda p: ordem[p['url']])
+        totais = {}
+        for termo in termos:
+            encontradas = [p for p in paginas if not p['erro'] and
+                           (p['termos'][termo]['ocorrencias_html'] or p['termos'][termo]['ocorrencias_visiveis'])]
+            totais[termo] = {
+                'ocorrencias_html': sum(p['termos'][termo]['ocorrencias_html'] for p in paginas if not p['erro']),
+                'ocorrencias_visiveis': sum(p['termos'][termo]['ocorrencias_visiveis'] for p in paginas if not p['erro']),
+                'paginas': [p['url'] for p in encontradas]
+            }
+        return {
+            'termos': termos,
+            'case_sensitive': case_sensitive,
+            'segundos': round(time.perf_counter() - inicio, 3),
+            'paginas': paginas,
+            'totais': totais
+        }
+    
+    def exibir_resumo_lote(self, relatorio):
+        """Exibe os totais agregados do modo em lote"""
+        paginas = relatorio['paginas']
+        erros = [p for p in paginas if p['erro']]
+        print(f"\n{Fore.CYAN}{'='*80}")
+        print(f"{Fore.CYAN}                     RESUMO DA BUSCA EM LOTE")
+        print(f"{Fore.CYAN}{'='*80}")
+        print(f"{Fore.WHITE}Páginas analisadas: {Fore.GREEN}{len(paginas) - len(erros)}"
+              f"{Fore.WHITE} de {len(paginas)} em {relatorio['segundos']:.1f}s")
+        if erros:
+            print(f"{Fore.WHITE}Páginas com erro: {Fore.RED}{len(erros)}")
+        dinamicas = [p for p in paginas if p['dinamica']]
+        if dinamicas:
+            print(f"{Fore.YELLOW}⚠️  {len(dinamicas)} página(s) parecem dinâmicas; os resultados podem estar incompletos.")
+        
+        print(f"\n{Fore.CYAN}📊 TOTAIS POR TERMO:")
+        print(f"{Fore.CYAN}{'-'*80}")
+        for termo, total in relatorio['totais'].items():
+            print(f"{Fore.YELLOW}'{termo}'{Fore.WHITE}: {Fore.GREEN}{total['ocorrencias_html']}{Fore.WHITE} no HTML, "
+                  f"{Fore.GREEN}{total['ocorrencias_visiveis']}{Fore.WHITE} no texto visível, "
+                  f"em {Fore.GREEN}{len(total['paginas'])}{Fore.WHITE} página(s)")
+            for url in total['paginas'][:10]:
+                print(f"{Fore.LIGHTBLACK_EX}   {url}")
+            if len(total['paginas']) > 10:
+                print(f"{Fore.LIGHTBLACK_EX}   ... e mais {len(total['paginas']) - 10} (veja o relatório completo com --saida)")
+    
+    def salvar_relatorio_lote(self, relatorio, filename):
+        """Salva o relatório completo do modo em lote (com todas as ocorrências) em JSON"""
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(relatorio, f, ensure_ascii=False, indent=2)
+            print(f"{Fore.GREEN}✅ Resultados salvos em: {filename}")
+        except Exception as e:
+            print(f"{Fore.RED}❌ Erro ao salvar arquivo: {e}")
     
     def calcular_tamanho_arquivo_resultado(self, resultados, texto_busca, url):
         """Calcula o tamanho estimado do arquivo de resultado"""
@@ -371,8 +582,45 @@ class TextSearcher:
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description='Busca de texto em páginas web')
+    parser.add_argument('--urls', help="arquivo com uma URL por linha ('-' para ler da entrada padrão); "
+                                       "sem esta opção, o modo é interativo")
+    parser.add_argument('-t', '--termo', action='append', default=[], help='texto a buscar (pode repetir)')
+    parser.add_argument('--case-sensitive', action='store_true', help='diferencia maiúsculas/minúsculas')
+    parser.add_argument('--workers', type=int, default=8, help='downloads em paralelo (padrão: 8)')
+    parser.add_argument('--por-host', type=int, default=2, help='conexões simultâneas por host (padrão: 2)')
+    parser.add_argument('--intervalo', type=float, default=0.5,
+                        help='segundos entre requisições ao mesmo host (padrão: 0.5)')
+    parser.add_argument('--saida', help='salva o relatório completo em JSON')
+    args = parser.parse_args()
+
     searcher = TextSearcher()
-    searcher.executar()
+    if not args.urls:
+        searcher.executar()
+        return
+
+    if not args.termo:
+        parser.error('informe ao menos um texto com -t/--termo')
+    try:
+        urls, invalidas = searcher.ler_urls(args.urls)
+    except OSError as e:
+        print(f"{Fore.RED}❌ Erro ao ler a lista de URLs: {e}")
+        sys.exit(1)
+    for url in invalidas:
+        print(f"{Fore.RED}❌ URL inválida ignorada: {url}")
+    if not urls:
+        print(f"{Fore.RED}❌ Nenhuma URL válida para buscar.")
+        sys.exit(1)
+
+    try:
+        relatorio = searcher.executar_lote(urls, args.termo, args.case_sensitive,
+                                           max(1, args.workers), max(1, args.por_host), max(0.0, args.intervalo))
+    except KeyboardInterrupt:
+        print(f"\n{Fore.YELLOW}⚠️  Operação cancelada pelo usuário.")
+        sys.exit(1)
+    searcher.exibir_resumo_lote(relatorio)
+    if args.saida:
+        searcher.salvar_relatorio_lote(relatorio, args.saida)
 
 
 if __name__ == "__main__":
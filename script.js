@@ -54,6 +54,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     updateStats();
     renderTasks();
     showView('home');
+    subscribeToChanges();
 });
 
 // Toggle theme
@@ -109,6 +110,44 @@ function showView(viewId) {
 const API_BASE = '/api'; // Sempre usar o backend Flask local
 
 
+// Versão do servidor conhecida pelo cliente (usada na sincronização incremental)
+let serverEpoch = null;
+let serverVersion = 0;
+// Última lista confirmada pelo servidor; as alterações são calculadas contra ela
+let syncedTasks = null;
+
+// Converter entrada do backend para tarefa do frontend
+function entryToTask(entry) {
+    return {
+        id: entry.id,
+        title: entry.title,
+        description: entry.content,
+        date: entry.date,
+        completed: entry.completed || false,
+        priority: entry.priority || 'medium',
+        category: entry.category || 'personal',
+        dueDate: entry.dueDate || '',
+        createdAt: entry.createdAt || entry.date,
+        updatedAt: entry.updatedAt || entry.date
+    };
+}
+
+// Converter tarefa do frontend para entrada do backend
+function taskToEntry(task) {
+    return {
+        id: task.id,
+        date: task.date || new Date().toISOString().slice(0, 10),
+        title: task.title,
+        content: task.description || '',
+        completed: task.completed || false,
+        priority: task.priority || 'medium',
+        category: task.category || 'personal',
+        dueDate: task.dueDate || '',
+        createdAt: task.createdAt || new Date().toISOString(),
+        updatedAt: task.updatedAt || new Date().toISOString()
+    };
+}
+
 async function loadTasksFromServer() {
     try {
         syncStatus.className = 'sync-status saving';
@@ -116,20 +155,11 @@ async function loadTasksFromServer() {
         const response = await fetch(`${API_BASE}/entries`);
         if (!response.ok) throw new Error('Falha ao carregar tarefas');
         const entries = await response.json();
-        // Converter entradas do backend para tarefas do frontend
-        const tasks = entries.map(entry => ({
-            id: entry.id,
-            title: entry.title,
-            description: entry.content,
-            date: entry.date,
-            completed: entry.completed || false,
-            priority: entry.priority || 'medium',
-            category: entry.category || 'personal',
-            dueDate: entry.dueDate || '',
-            createdAt: entry.createdAt || entry.date,
-            updatedAt: entry.updatedAt || entry.date
-        }));
+        serverEpoch = response.headers.get('X-Entries-Epoch');
+        serverVersion = parseInt(response.headers.get('X-Entries-Version'), 10) || 0;
+        const tasks = entries.map(entryToTask);
         localStorage.setItem('todoTasks', JSON.stringify(tasks));
+        syncedTasks = tasks;
         syncStatus.className = 'sync-status connected';
         syncStatus.title = 'Conectado ao servidor - dados sincronizados';
         return tasks;
@@ -141,33 +171,61 @@ async function loadTasksFromServer() {
     }
 }
 
+// Calcula o que mudou entre duas listas de tarefas (enviado em /entries/sync)
+function diffTasks(previousTasks, tasks) {
+    const previous = new Map(previousTasks.map(task => [task.id, JSON.stringify(taskToEntry(task))]));
+    const upserts = [];
+    for (const task of tasks) {
+        const entry = taskToEntry(task);
+        if (previous.get(task.id) !== JSON.stringify(entry)) {
+            upserts.push(entry);
+        }
+        previous.delete(task.id);
+    }
+    const current = new Map(previousTasks.map(task => [task.id, task]));
+    const deletes = [...previous.keys()].map(id => ({ id, updatedAt: current.get(id).updatedAt }));
+    return { upserts, deletes };
+}
 
 async function saveTasksToServer(tasks) {
     try {
         syncStatus.className = 'sync-status saving';
         syncStatus.title = 'Salvando no servidor...';
-        // Converter tarefas do frontend para formato de entradas do backend
-        const entries = tasks.map(task => ({
-            id: task.id,
-            date: task.date || new Date().toISOString().slice(0, 10),
-            title: task.title,
-            content: task.description || '',
-            completed: task.completed || false,
-            priority: task.priority || 'medium',
-            category: task.category || 'personal',
-            dueDate: task.dueDate || '',
-            createdAt: task.createdAt || new Date().toISOString(),
-            updatedAt: task.updatedAt || new Date().toISOString()
-        }));
-        const response = await fetch(`${API_BASE}/entries`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify(entries)
-        });
-        if (!response.ok) throw new Error('Falha ao salvar tarefas');
         localStorage.setItem('todoTasks', JSON.stringify(tasks));
+        if (syncedTasks === null) {
+            // Nunca sincronizado (iniciou offline): enviar a lista inteira
+            const response = await fetch(`${API_BASE}/entries`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify(tasks.map(taskToEntry))
+            });
+            if (!response.ok) throw new Error('Falha ao salvar tarefas');
+            syncedTasks = tasks;
+        } else {
+            // Enviar apenas as tarefas criadas, alteradas ou removidas
+            const { upserts, deletes } = diffTasks(syncedTasks, tasks);
+            if (upserts.length > 0 || deletes.length > 0) {
+                const response = await fetch(`${API_BASE}/entries/sync`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify({ upserts, deletes })
+                });
+                if (!response.ok) throw new Error('Falha ao salvar tarefas');
+                const result = await response.json();
+                serverEpoch = result.epoch;
+                serverVersion = result.version;
+                syncedTasks = tasks;
+                if (result.conflicts.length > 0) {
+                    // O servidor tem versões mais novas: recarregar a lista
+                    console.warn('Conflitos ao sincronizar, recarregando do servidor:', result.conflicts);
+                    await loadTasksFromServer();
+                }
+            }
+        }
         updateStats();
         syncStatus.className = 'sync-status connected';
         syncStatus.title = 'Salvo no servidor com sucesso';
@@ -182,6 +240,83 @@ async function saveTasksToServer(tasks) {
     }
 }
 
+// --- Alterações em tempo real (server-sent events) ---
+
+let changeEvents = null;
+let renderScheduled = false;
+
+// Aplica uma alteração do servidor a uma lista de tarefas. Com keepNewer,
+// uma tarefa editada localmente depois da alteração é mantida
+function applyChange(tasks, change, keepNewer) {
+    const index = tasks.findIndex(task => task.id === change.id);
+    const task = change.op === 'put' ? entryToTask(change.entry) : null;
+    if (keepNewer && task && index !== -1 && tasks[index].updatedAt > task.updatedAt) {
+        return tasks;
+    }
+    const others = tasks.filter(task => task.id !== change.id);
+    if (task) {
+        if (index === -1) {
+            others.push(task);
+        } else {
+            others.splice(index, 0, task);
+        }
+    }
+    return others;
+}
+
+// Várias alterações seguidas geram uma única renderização
+function scheduleRender() {
+    if (renderScheduled) return;
+    renderScheduled = true;
+    setTimeout(() => {
+        renderScheduled = false;
+        updateStats();
+        if (currentView === 'tasks') {
+            renderTasks();
+        } else if (currentView === 'completed') {
+            renderCompletedTasks();
+        }
+    }, 50);
+}
+
+// Recebe do servidor cada tarefa criada, alterada ou removida (em outras
+// abas ou dispositivos) em vez de baixar a lista inteira de novo
+function subscribeToChanges(since = serverVersion) {
+    if (!window.EventSource || serverEpoch === null) return;
+    if (changeEvents) changeEvents.close();
+    // Posição no fluxo de eventos: a versão devolvida pelo sync pode pular
+    // alterações de outras abas que ainda não chegaram por aqui
+    let streamVersion = since;
+    changeEvents = new EventSource(`${API_BASE}/entries/events?epoch=${encodeURIComponent(serverEpoch)}&since=${since}`);
+
+    changeEvents.addEventListener('change', event => {
+        const change = JSON.parse(event.data);
+        streamVersion = change.version;
+        serverVersion = Math.max(serverVersion, change.version);
+        localStorage.setItem('todoTasks', JSON.stringify(applyChange(getTasks(), change, true)));
+        if (syncedTasks !== null) {
+            syncedTasks = applyChange(syncedTasks, change, false);
+        }
+        scheduleRender();
+    });
+
+    changeEvents.addEventListener('reset', async () => {
+        // O servidor foi recarregado ou o histórico não cobre esta aba
+        changeEvents.close();
+        await loadTasksFromServer();
+        scheduleRender();
+        subscribeToChanges();
+    });
+
+    changeEvents.onerror = () => {
+        // O EventSource reconecta sozinho; só desiste se o servidor recusar
+        // (ex.: limite de conexões), então tentar de novo mais tarde
+        if (changeEvents.readyState === EventSource.CLOSED) {
+            setTimeout(() => subscribeToChanges(streamVersion), 30000);
+        }
+    };
+}
+
 function getTasks() {
     return JSON.parse(localStorage.getItem('todoTasks')) || [];
 }
@@ -0,0 +1,143 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+import unicodedata
+
+# Datas como '2025-07-12' viram um único termo, então '2025-07' casa por prefixo
+TOKEN_RE = re.compile(r'\d+(?:-\d+)*|\w+')
+
+# Peso de cada campo no cálculo de relevância
+FIELD_WEIGHTS = {'title': 3.0, 'content': 1.0, 'date': 1.0}
+# Um termo encontrado só por prefixo vale menos que o termo exato
+PREFIX_FACTOR = 0.5
+
+
+class _FoldTable(dict):
+    """
+    Tabela de str.translate montada sob demanda: cada caractere vira sua
+    decomposição NFKD sem os sinais combinantes. Como a decomposição é por
+    caractere e os sinais são descartados, o resultado é o mesmo de
+    normalizar o texto inteiro, mas sem percorrê-lo em Python.
+    """
+
+    def __missing__(self, codepoint):
+        decomposed = unicodedata.normalize('NFKD', chr(codepoint))
+        folded = ''.join(c for c in decomposed if not unicodedata.combining(c))
+        self[codepoint] = folded
+        return folded
+
+
+_FOLD_TABLE = _FoldTable()
+
+
+def fold(text):
+    """Minúsculas e sem acentos: 'Música' -> 'musica'"""
+    lowered = text.lower()
+    if lowered.isascii():
+        return lowered
+    return lowered.translate(_FOLD_TABLE)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(fold(text))
+
+
+class SearchIndex:
+    """
+    Índice invertido de title, content e date, mantido pelo EntryStore.
+    As buscas exigem todos os termos (cada um por palavra exata ou prefixo)
+    e retornam os ids ordenados por relevância (peso do campo x idf).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}    # termo -> {id: peso}
+        self._doc_terms = {}   # id -> {termo: peso}, para remover depois
+        self._vocabulary = []  # termos ordenados, para busca por prefixo
+
+    # --- Manutenção (chamado pelo store) ---
+
+    def reset(self, entries):
+        with self._lock:
+            self._postings = {}
+            self._doc_terms = {}
+            for entry in entries:
+                self._add(entry, keep_sorted=False)
+            self._vocabulary = sorted(self._postings)
+
+    def apply(self, old, new):
+        with self._lock:
+            if old is not None:
+                self._remove(str(old['id']))
+            if new is not None:
+                self._add(new)
+
+    @staticmethod
+    def _entry_terms(entry):
+        terms = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(entry.get(field) or ''):
+                terms[token] = terms.get(token, 0.0) + weight
+        return terms
+
+    def _add(self, entry, keep_sorted=True):
+        entry_id = str(entry['id'])
+        terms = self._entry_terms(entry)
+        self._doc_terms[entry_id] = terms
+        for term, weight in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                if keep_sorted:
+                    bisect.insort(self._vocabulary, term)
+            postings[entry_id] = weight
+
+    def _remove(self, entry_id):
+        terms = self._doc_terms.pop(entry_id, {})
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(entry_id, None)
+            if not postings:
+                del self._postings[term]
+                i = bisect.bisect_left(self._vocabulary, term)
+                if i < len(self._vocabulary) and self._vocabulary[i] == term:
+                    del self._vocabulary[i]
+
+    # --- Consultas ---
+
+    def _expand(self, token):
+        """Termos do vocabulário que começam com o token"""
+        i = bisect.bisect_left(self._vocabulary, token)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(token):
+            yield self._vocabulary[i]
+            i += 1
+
+    def search(self, query, limit=50):
+        """Retorna [(id, score)] em ordem decrescente de relevância"""
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+        with self._lock:
+            total_docs = len(self._doc_terms) or 1
+            scores = None
+            for token in query_tokens:
+                token_scores = {}
+                for term in self._expand(token):
+                    postings = self._postings[term]
+                    idf = math.log(1 + total_docs / len(postings))
+                    factor = 1.0 if term == token else PREFIX_FACTOR
+                    for entry_id, weight in postings.items():
+                        token_scores[entry_id] = token_scores.get(entry_id, 0.0) + weight * idf * factor
+                if scores is None:
+                    scores = token_scores
+                else:
+                    # Todos os termos da consulta precisam aparecer
+                    scores = {entry_id: score + token_scores[entry_id]
+                              for entry_id, score in scores.items() if entry_id in token_scores}
+                if not scores:
+                    return []
+        return heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,254 @@
+"""
+Snapshot binário das entradas (task-data.snap), alternativa compacta ao
+task-data.json com indent=2.
+
+As entradas são gravadas por colunas, agrupadas pelo conjunto de campos
+(normalmente um grupo só):
+
+    b'TSNAP' + versão (u8) + tamanho do manifesto (u32)
+    manifesto   JSON com a quantidade de entradas e, por grupo, os campos,
+                a posição de cada coluna e a ordem original das entradas
+    colunas     'text'  textos separados por '\\0' (UTF-8)
+                'codes' campos repetitivos (date, category, priority, ...):
+                        tabela de valores no manifesto + um código por entrada
+                'json'  qualquer outro valor, como array JSON
+
+Decodificar uma coluna é um split ou um array de inteiros, em C, e os
+valores repetidos viram o mesmo objeto em memória. O arquivo é lido via
+mmap e as colunas só são decodificadas quando usadas: reader[i] e
+reader.get(id) montam apenas a entrada pedida.
+
+Uso na linha de comando:
+    python snapshot.py import task-data.json task-data.snap
+    python snapshot.py export task-data.snap task-data.json
+"""
+import itertools
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b'TSNAP'
+VERSION = 1
+HEADER = struct.Struct('<5sBI')
+# Uma coluna vira 'codes' se tiver no máximo isso de valores distintos
+# (proporcionalmente ao número de entradas)
+CODES_RATIO = 0.25
+CODE_WIDTHS = (('B', 0xFF), ('H', 0xFFFF), ('I', 0xFFFFFFFF))
+
+
+def _little_endian(values):
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def _encode_column(values):
+    """Retorna (descrição da coluna, bytes)"""
+    try:
+        # O tipo entra na chave: para um set, True e 1 são o mesmo valor
+        distinct = {(type(v).__name__, v) for v in values}
+    except TypeError:   # listas, dicts
+        distinct = None
+    if distinct is not None and len(distinct) <= max(16, len(values) * CODES_RATIO):
+        table = sorted(distinct, key=repr)
+        codes = {key: i for i, key in enumerate(table)}
+        width = next(code for code, limit in CODE_WIDTHS if len(table) <= limit)
+        data = array(width, [codes[(type(v).__name__, v)] for v in values])
+        return ({'type': 'codes', 'width': width, 'values': [v for _, v in table]},
+                _little_endian(data).tobytes())
+    if all(type(v) is str and '\0' not in v for v in values):
+        return {'type': 'text'}, '\0'.join(values).encode('utf-8')
+    return {'type': 'json'}, json.dumps(values, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def encode_snapshot(entries):
+    """Retorna o conteúdo do arquivo de snapshot para a lista de entradas"""
+    groups = {}   # campos -> posições das entradas
+    for position, entry in enumerate(entries):
+        groups.setdefault(tuple(entry), []).append(position)
+
+    payload = []
+    size = 0
+    manifest = {'count': len(entries), 'groups': []}
+    for keys, positions in groups.items():
+        group = {'keys': list(keys), 'rows': len(positions), 'columns': [], 'positions': None}
+        if len(groups) > 1:
+            data = _little_endian(array('I', positions)).tobytes()
+            group['positions'] = [size, len(data)]
+            payload.append(data)
+            size += len(data)
+        for key in keys:
+            column, data = _encode_column([entries[p][key] for p in positions])
+            column.update(offset=size, size=len(data))
+            group['columns'].append(column)
+            payload.append(data)
+            size += len(data)
+        manifest['groups'].append(group)
+
+    manifest_bytes = json.dumps(manifest, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return b''.join([HEADER.pack(MAGIC, VERSION, len(manifest_bytes)), manifest_bytes] + payload)
+
+
+def write_snapshot(path, entries):
+    """Grava o snapshot em um arquivo temporário, com fsync, e renomeia"""
+    data = encode_snapshot(entries)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SnapshotReader:
+    """
+    Leitura do snapshot via mmap. load_all() monta todas as entradas;
+    reader[i] e get(id) decodificam só as colunas necessárias e montam
+    só a entrada pedida.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise ValueError(f'Snapshot inválido: {path}')
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, manifest_size = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f'Snapshot inválido ou de versão desconhecida: {path}')
+        manifest_end = HEADER.size + manifest_size
+        manifest = json.loads(self._mm[HEADER.size:manifest_end])
+        self._base = manifest_end
+        self._count = manifest['count']
+        self._groups = manifest['groups']
+        self._columns = {}     # (grupo, campo) -> valores decodificados
+        self._locations = None   # posição -> (grupo, linha), se houver vários grupos
+        self._positions = None   # id -> posição, montado no primeiro get()
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    # --- Colunas ---
+
+    def _slice(self, offset, size):
+        start = self._base + offset
+        return self._mm[start:start + size]
+
+    def _decode_column(self, column, rows):
+        data = self._slice(column['offset'], column['size'])
+        if column['type'] == 'text':
+            return data.decode('utf-8').split('\0') if rows else []
+        if column['type'] == 'codes':
+            codes = _little_endian(array(column['width'], data))
+            return list(map(column['values'].__getitem__, codes))
+        return json.loads(data)
+
+    def _column(self, group_index, key_index):
+        values = self._columns.get((group_index, key_index))
+        if values is None:
+            group = self._groups[group_index]
+            values = self._decode_column(group['columns'][key_index], group['rows'])
+            self._columns[(group_index, key_index)] = values
+        return values
+
+    def _group_positions(self, group_index):
+        group = self._groups[group_index]
+        if group['positions'] is None:
+            return range(group['rows'])
+        return _little_endian(array('I', self._slice(*group['positions'])))
+
+    # --- Acesso ---
+
+    def _rows(self, group):
+        keys = group['keys']
+        if not keys:   # entradas vazias ({})
+            return ({} for _ in range(group['rows']))
+        columns = [self._decode_column(column, group['rows']) for column in group['columns']]
+        return map(dict, map(zip, itertools.repeat(keys), zip(*columns)))
+
+    def load_all(self):
+        if len(self._groups) == 1:
+            return list(self._rows(self._groups[0]))
+        entries = [None] * self._count
+        for group_index, group in enumerate(self._groups):
+            for position, row in zip(self._group_positions(group_index), self._rows(group)):
+                entries[position] = row
+        return entries
+
+    def _locate(self, position):
+        if len(self._groups) == 1:
+            return 0, position
+        if self._locations is None:
+            self._locations = {}
+            for group_index in range(len(self._groups)):
+                for row, p in enumerate(self._group_positions(group_index)):
+                    self._locations[p] = (group_index, row)
+        return self._locations[position]
+
+    def __getitem__(self, position):
+        if not -self._count <= position < self._count:
+            raise IndexError(position)
+        group_index, row = self._locate(position % self._count)
+        keys = self._groups[group_index]['keys']
+        return {key: self._column(group_index, i)[row] for i, key in enumerate(keys)}
+
+    def ids(self):
+        """Ids na ordem do snapshot, decodificando só as colunas de id"""
+        ids = [None] * self._count
+        for group_index, group in enumerate(self._groups):
+            column = self._column(group_index, group['keys'].index('id'))
+            for position, entry_id in zip(self._group_positions(group_index), column):
+                ids[position] = str(entry_id)
+        return ids
+
+    def get(self, entry_id):
+        if self._positions is None:
+            self._positions = {key: i for i, key in enumerate(self.ids())}
+        position = self._positions.get(str(entry_id))
+        return None if position is None else self[position]
+
+
+def read_snapshot(path):
+    """Todas as entradas do snapshot ([] se o arquivo não existe)"""
+    if not os.path.exists(path):
+        return []
+    with SnapshotReader(path) as reader:
+        return reader.load_all()
+
+
+def import_json(json_path, snapshot_path):
+    """Converte um arquivo no formato do task-data.json para snapshot"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    write_snapshot(snapshot_path, entries)
+    return len(entries)
+
+
+def export_json(snapshot_path, json_path):
+    """Converte o snapshot para o formato do task-data.json"""
+    entries = read_snapshot(snapshot_path)
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+    return len(entries)
+
+
+if __name__ == '__main__':
+    commands = {'import': import_json, 'export': export_json}
+    if len(sys.argv) != 4 or sys.argv[1] not in commands:
+        print(__doc__.split('Uso na linha de comando:')[1].rstrip())
+        sys.exit(1)
+    count = commands[sys.argv[1]](sys.argv[2], sys.argv[3])
+    print(f"{count} entradas convertidas de {sys.argv[2]} para {sys.argv[3]}.")
@@ -0,0 +1,363 @@
+import contextlib
+import threading
+import time
+
+
+class EntryStore:
+    """
+    Mantém as entradas do diário residentes em memória.
+    O backend (JSON ou SQLite, ver backends.py) é lido uma única vez e só
+    é recarregado quando alguém o altera por fora.
+
+    Com um backend que suporta compactação (JSON em modo journal), uma
+    thread em segundo plano reescreve o snapshot periodicamente.
+
+    `epoch` e `version` (ver changelog.py) ficam gravados no backend junto
+    com as entradas, então todos os workers usam os mesmos números: cada
+    registro gravado avança a versão e uma substituição completa começa
+    uma época nova.
+    """
+
+    def __init__(self, backend, compact_interval=30):
+        self.backend = backend
+        self.compact_interval = compact_interval
+        self._lock = threading.RLock()
+        self._entries = {}   # id (str) -> entrada, na ordem do backend
+        self._signature = None
+        self._compactor = None
+        self._listeners = []   # índices mantidos junto com as entradas
+        self.epoch = None
+        self.version = 0
+
+    # --- Leitura do backend ---
+
+    def _load_from_disk(self):
+        """
+        Se na mesma época a versão só avançou (escrita de outro worker), as
+        diferenças viram alterações para os listeners. Outra época vale como
+        recarga completa; dados diferentes sem a versão avançar (arquivo
+        editado à mão) começam uma época nova, gravada para os outros workers.
+        """
+        previous = self._entries
+        self._entries = {str(e['id']): e for e in self.backend.load()}
+        epoch, version = self.backend.position()
+        if epoch is not None and epoch == self.epoch:
+            changes = self._diff(previous, self._entries)
+            if version > self.version or (version == self.version and not changes):
+                self.version = version
+                self._signature = self.backend.signature()
+                self._notify(changes)
+                return
+            epoch = None
+        if epoch is None:
+            epoch, version = self._new_epoch(), 0
+            self.backend.set_position(epoch, version)
+        self.epoch, self.version = epoch, version
+        self._signature = self.backend.signature()
+        self._reset_listeners()
+
+    @staticmethod
+    def _new_epoch():
+        return f"{time.time_ns():x}"
+
+    @staticmethod
+    def _diff(before, after):
+        """Pares (anterior, nova) das entradas que mudaram entre dois estados"""
+        changes = [(entry, None) for key, entry in before.items() if key not in after]
+        changes += [(before.get(key), entry) for key, entry in after.items() if before.get(key) != entry]
+        return changes
+
+    def position(self):
+        """(época, versão) da última leitura ou escrita"""
+        return self.epoch, self.version
+
+    # --- Índices ---
+
+    def add_listener(self, listener):
+        """
+        Registra um objeto com os métodos reset(entries) e apply(old, new),
+        chamados a cada recarga e a cada alteração de uma entrada
+        (old=None na criação, new=None na remoção). Se ele tiver
+        apply_many(changes), recebe de uma vez os pares (old, new) de cada
+        escrita.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+            listener.reset(list(self._entries.values()))
+
+    def _reset_listeners(self):
+        entries = list(self._entries.values())
+        for listener in self._listeners:
+            listener.reset(entries)
+
+    def _notify(self, changes):
+        for listener in self._listeners:
+            apply_many = getattr(listener, 'apply_many', None)
+            if apply_many is not None:
+                apply_many(changes)
+                continue
+            for old, new in changes:
+                listener.apply(old, new)
+
+    def refresh(self):
+        """
+        Recarrega do backend se ele mudou desde a última leitura/escrita
+        (inclusive por outro worker). A checagem não usa o lock entre
+        processos; só a recarga em si.
+        """
+        with self._lock:
+            signature = self.backend.signature()
+            if self._signature is None or signature != self._signature:
+                with self.backend.lock:
+                    self._load_from_disk()
+
+    @contextlib.contextmanager
+    def _writing(self):
+        """Locks para uma escrita: threads deste processo e outros workers"""
+        with self._lock, self.backend.lock:
+            yield
+
+    # --- Escrita no backend ---
+
+    def _write_all(self):
+        epoch = self._new_epoch()
+        ok = self.backend.write_all(list(self._entries.values()), (epoch, 0))
+        self._signature = self.backend.signature()
+        if ok:
+            self.epoch, self.version = epoch, 0
+        return ok
+
+    def _persist(self, *records):
+        """Grava alterações de entradas individuais (uma única gravação)"""
+        version = self.version + len(records)
+        ok = self.backend.write_records(records, lambda: list(self._entries.values()),
+                                        (self.epoch, version))
+        self._signature = self.backend.signature()
+        if ok:
+            self.version = version
+        if ok and self.backend.supports_compaction:
+            # Só processos que escrevem compactam (o processo do reloader
+            # do Flask em modo debug nunca chega aqui)
+            self.start_compactor()
+        return ok
+
+    # --- Compactação ---
+
+    def compact(self):
+        """
+        Reescreve o snapshot do backend com o estado atual. A parte pesada
+        (serializar e gravar) acontece fora do lock, então as escritas
+        seguintes não esperam por ela.
+        """
+        if not self.backend.supports_compaction:
+            return
+        with self._writing():
+            self.refresh()
+            token = self.backend.begin_compaction()
+            if token is None:
+                return
+            entries = list(self._entries.values())
+            self._signature = self.backend.signature()
+        written = self.backend.finish_compaction(token, entries)
+        with self._lock:
+            # Só adota a nova assinatura se ninguém mais escreveu no meio;
+            # senão a próxima leitura recarrega do disco
+            if written is not None and self._signature == written[0]:
+                self._signature = written[1]
+
+    def _compact_loop(self):
+        while True:
+            self.backend.compact_wanted.wait(self.compact_interval)
+            self.backend.compact_wanted.clear()
+            self.compact()
+
+    def start_compactor(self):
+        """Inicia a thread de compactação em segundo plano"""
+        if self.backend.supports_compaction and self._compactor is None:
+            self._compactor = threading.Thread(target=self._compact_loop, daemon=True)
+            self._compactor.start()
+
+    # --- API usada pelas rotas ---
+
+    def all(self):
+        """Retorna uma cópia da lista de entradas"""
+        with self._lock:
+            self.refresh()
+            return list(self._entries.values())
+
+    def get(self, entry_id):
+        with self._lock:
+            self.refresh()
+            return self._entries.get(str(entry_id))
+
+    def get_many(self, entry_ids):
+        """Retorna as entradas dos ids informados que ainda existem"""
+        with self._lock:
+            self.refresh()
+            return [self._entries[key] for key in entry_ids if key in self._entries]
+
+    def count(self):
+        with self._lock:
+            self.refresh()
+            return len(self._entries)
+
+    def replace_all(self, entries):
+        """Substitui todas as entradas (equivalente ao antigo save_entries)"""
+        with self._writing():
+            previous = self._entries
+            self.refresh()
+            self._entries = {str(e['id']): e for e in entries}
+            if self._write_all():
+                self._reset_listeners()
+                return True
+            self._entries = previous
+            return False
+
+    def update(self, entry_id, data):
+        """
+        Atualiza os campos de uma entrada. Retorna a entrada ou None se não
+        existir; trocar o id para o de outra entrada existente levanta
+        ValueError (nada é alterado).
+        """
+        with self._writing():
+            self.refresh()
+            key = str(entry_id)
+            previous = self._entries.get(key)
+            if previous is None:
+                return None
+            # Copy-on-write: dicts já entregues (ex.: a uma compactação em
+            # andamento) nunca são alterados
+            entry = {**previous, **data}
+            new_key = str(entry['id'])
+            if new_key != key and new_key in self._entries:
+                raise ValueError(f"Já existe uma entrada com o id {new_key}")
+            before = self._entries
+            if new_key != key:
+                self._entries = {(new_key if k == key else k): (entry if k == key else e)
+                                 for k, e in self._entries.items()}
+                ok = self._persist({'op': 'delete', 'id': key},
+                                   {'op': 'put', 'id': new_key, 'entry': entry})
+            else:
+                self._entries[key] = entry
+                ok = self._persist({'op': 'put', 'id': key, 'entry': entry})
+            if not ok:
+                if new_key != key:
+                    self._entries = before
+                else:
+                    self._entries[key] = previous
+                raise IOError('Erro ao salvar entrada')
+            self._notify([(previous, entry)])
+            return entry
+
+    def delete(self, entry_id):
+        """Remove uma entrada. Retorna True se ela existia"""
+        with self._writing():
+            self.refresh()
+            key = str(entry_id)
+            if key not in self._entries:
+                return False
+            entry = self._entries.pop(key)
+            if not self._persist({'op': 'delete', 'id': key}):
+                self._entries[key] = entry
+                raise IOError('Erro ao salvar após deletar')
+            self._notify([(entry, None)])
+            return True
+
+    def apply_batch(self, upserts, deletes):
+        """
+        Aplica várias criações/atualizações/remoções com uma única gravação.
+        Resolve conflitos por updatedAt (vence a escrita mais recente): uma
+        alteração cujo updatedAt é mais antigo que o do servidor é recusada.
+        Retorna (ids aplicados, entradas do servidor em conflito).
+        """
+        with self._writing():
+            self.refresh()
+            changes = []    # (anterior, nova), também usado para desfazer
+            records = []
+            conflicts = []
+            for data in upserts:
+                key = str(data['id'])
+                previous = self._entries.get(key)
+                if previous is not None and self._is_newer(previous, data):
+                    conflicts.append(previous)
+                    continue
+                entry = {**(previous or {}), **data}
+                self._entries[key] = entry
+                changes.append((previous, entry))
+                records.append({'op': 'put', 'id': key, 'entry': entry})
+            for data in deletes:
+                key = str(data['id'])
+                previous = self._entries.get(key)
+                if previous is None:
+                    continue
+                if self._is_newer(previous, data):
+                    conflicts.append(previous)
+                    continue
+                del self._entries[key]
+                changes.append((previous, None))
+                records.append({'op': 'delete', 'id': key})
+            if not records:
+                return [], conflicts
+
+            if not self._persist(*records):
+                for previous, entry in reversed(changes):
+                    key = str((entry or previous)['id'])
+                    if previous is None:
+                        self._entries.pop(key, None)
+                    else:
+                        self._entries[key] = previous
+                raise IOError('Erro ao salvar alterações')
+            self._notify(changes)
+            return [record['id'] for record in records], conflicts
+
+    def move_out(self, predicate, sink):
+        """
+        Tira do store as entradas que passam em predicate(entry), entregando-as
+        antes a sink(entradas) (ex.: o arquivo morto). Se sink falhar nada é
+        removido; se a gravação falhar depois, as entradas ficam nos dois
+        lugares, nunca em nenhum. Retorna as entradas movidas.
+        """
+        with self._writing():
+            self.refresh()
+            moved = [entry for entry in self._entries.values() if predicate(entry)]
+            if not moved:
+                return []
+            sink(moved)
+            before = dict(self._entries)
+            for entry in moved:
+                del self._entries[str(entry['id'])]
+            if not self._persist(*({'op': 'delete', 'id': str(entry['id'])} for entry in moved)):
+                self._entries = before
+                raise IOError('Erro ao salvar após arquivar')
+            self._notify([(entry, None) for entry in moved])
+            return moved
+
+    def move_in(self, fetch, release):
+        """
+        Inverso de move_out: grava no store as entradas devolvidas por fetch()
+        e só então chama release(entradas) para tirá-las da origem.
+        Retorna as entradas trazidas.
+        """
+        with self._writing():
+            self.refresh()
+            entries = fetch()
+            if not entries:
+                return []
+            before = dict(self._entries)
+            changes = [(self._entries.get(str(entry['id'])), entry) for entry in entries]
+            for entry in entries:
+                self._entries[str(entry['id'])] = entry
+            if not self._persist(*({'op': 'put', 'id': str(entry['id']), 'entry': entry} for entry in entries)):
+                self._entries = before
+                raise IOError('Erro ao salvar entradas restauradas')
+            self._notify(changes)
+            release(entries)
+            return entries
+
+    @staticmethod
+    def _is_newer(current, incoming):
+        """True se a versão do servidor é mais recente que a enviada"""
+        incoming_at = incoming.get('updatedAt')
+        current_at = current.get('updatedAt')
+        return bool(incoming_at and current_at and current_at > incoming_at)
+
@@ -3,16 +3,17 @@ import sounddevice as sd
 import numpy as np
 import scipy.io.wavfile as wavfile
 import keyboard
-import subprocess
 import os
-import re # Importa a biblioteca de expressões regulares para limpeza de texto
+import timing
 
-def record_audio(samplerate=16000, filename="audio.wav"):
-
-    # Se filename for um caminho absoluto ou relativo, usa como está
-    audio_path = filename
-    # Garante que a pasta do arquivo existe
-    os.makedirs(os.path.dirname(audio_path), exist_ok=True)
+def record_audio(samplerate=16000, debug_filename=None):
+    """
+    Grava do microfone e retorna o áudio em memória: array float32 mono,
+    no formato que o Whisper recebe direto (16 kHz, valores entre -1 e 1),
+    sem gravar e reler um .wav a cada comando.
+    Se `debug_filename` for informado, o áudio também é salvo nesse arquivo
+    (útil para depuração ou para repetir a transcrição depois).
+    """
     audio_buffer = []
 
     def callback(indata, frames, time, status):
@@ -25,58 +26,65 @@ def record_audio(samplerate=16000, filename="audio.wav"):
         """
         if status:
             print(status)
-        audio_buffer.append(indata.copy())
+        audio_buffer.append(indata[:, 0].copy())
 
     print("Pressione 'Enter' para COMEÇAR a gravar.")
     keyboard.wait('enter')
 
     print("\nGRAVANDO... Pressione 'Enter' para parar.")
-    with sd.InputStream(samplerate=samplerate, channels=1, dtype='int16', callback=callback):
-        keyboard.wait('enter')
+    # float32 direto do dispositivo: evita a conversão de int16 depois
+    with timing.span('capture'):
+        with sd.InputStream(samplerate=samplerate, channels=1, dtype='float32', callback=callback):
+            keyboard.wait('enter')
 
 
     print("Gravação PARADA. Processando...")
-    recorded_audio = np.concatenate(audio_buffer, axis=0)
-    wavfile.write(audio_path, samplerate, recorded_audio)
-    print(f"Arquivo '{audio_path}' salvo.")
-    return audio_path
+    with timing.span('audio_encode'):
+        if audio_buffer:
+            recorded_audio = np.concatenate(audio_buffer)
+        else:
+            recorded_audio = np.zeros(0, dtype=np.float32)
+        if debug_filename:
+            save_audio(debug_filename, recorded_audio, samplerate)
+    return recorded_audio
+
+def save_audio(filename, audio, samplerate=16000):
+    """Salva o áudio float32 como .wav PCM de 16 bits (depuração)"""
+    # Garante que a pasta do arquivo existe
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    wavfile.write(filename, samplerate, pcm)
+    print(f"Arquivo '{filename}' salvo.")
+
+_models = {} # Modelos já carregados neste processo, por nome
+
+def load_model(model_name="base"):
+    """
+    Carrega o modelo Whisper uma única vez por processo.
+    Para manter o modelo carregado entre execuções do main.py, use o
+    servidor de transcrição (daemon.py).
+    """
+    if model_name not in _models:
+        print(f"Carregando modelo Whisper ({model_name})...")
+        with timing.span('model_load'):
+            _models[model_name] = whisper.load_model(model_name)
+    return _models[model_name]
 
-def transcribe_audio(audio_path, model_name="base", language="pt"):
+def transcribe_audio(audio, model_name="base", language="pt"):
     """
-    Transcreve o áudio de um arquivo usando o modelo Whisper.
+    Transcreve o áudio usando o modelo Whisper. `audio` é um array float32
+    mono de 16 kHz (como o de record_audio) ou o caminho de um arquivo,
+    que o Whisper decodifica com o ffmpeg.
     Lista de modelos disponíveis em: https://huggingface.co/openai/whisper-base
     Lista de idiomas suportados: pt, en, es, fr, de, it, nl, ru, zh, ja, ko, etc.
     """
-    print(f"Carregando modelo Whisper ({model_name})...")
-    model = whisper.load_model(model_name)
+    model = load_model(model_name)
 
     print("Transcrevendo áudio...")
-    result = model.transcribe(audio_path, language=language)
+    with timing.span('inference'):
+        result = model.transcribe(audio, language=language)
 
     print("\n--- Transcrição ---")
     print(result["text"])
     print("-------------------")
     return result["text"]
-
-def clean_text(text):
-    """
-    Limpa o texto removendo pontuações e convertendo para minúsculas
-    para uma comparação mais flexível.
-    """
-    text = text.lower()
-    text = re.sub(r'[^\w\s]', '', text) # Remove tudo que não é letra, número ou espaço
-    return text
-
-def check_trigger_phrase(transcribed_text, trigger_phrases):
-    """
-    Verifica se alguma das frases acionadoras (ou suas variações)
-    está presente no texto transcrito.
-    A comparação é feita de forma redundante (case-insensitive e sem pontuação).
-    """
-    cleaned_transcribed_text = clean_text(transcribed_text)
-    
-    for phrase in trigger_phrases:
-        cleaned_phrase = clean_text(phrase)
-        if cleaned_phrase in cleaned_transcribed_text:
-            return True, phrase # Retorna True e a frase que foi detectada
-    return False, None # Retorna False se nenhuma frase for detectada
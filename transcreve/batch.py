@@ -0,0 +1,194 @@
+"""
+Transcrição em lote: transcreve todos os .wav de uma pasta (ou de uma
+lista de arquivos) em vários processos, cada um com o seu modelo Whisper
+carregado, e grava um resultado por linha (NDJSON).
+
+Os resultados ficam num cache em disco indexado pelo hash do conteúdo do
+arquivo (mais modelo e idioma): rodar de novo só transcreve os arquivos
+novos ou alterados, mesmo que tenham sido renomeados ou movidos.
+
+Uso:
+    python batch.py gravacoes/ --model small --workers 4 -o resultados.ndjson
+    python batch.py lista.txt          # um caminho por linha (# comenta)
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import whisper
+
+DEFAULT_CACHE = os.path.join('temp', 'transcricoes-cache.ndjson')
+
+_model = None   # modelo do processo trabalhador
+
+
+def find_audio_files(source):
+    """Arquivos .wav de uma pasta (recursivo) ou de um arquivo de lista"""
+    if os.path.isdir(source):
+        files = []
+        for root, _, names in os.walk(source):
+            files.extend(os.path.join(root, name) for name in names if name.lower().endswith('.wav'))
+        return sorted(files)
+    base = os.path.dirname(source)
+    with open(source, 'r', encoding='utf-8') as f:
+        lines = (line.strip() for line in f)
+        return [os.path.join(base, line) for line in lines if line and not line.startswith('#')]
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    """
+    Cache em NDJSON, só de acréscimos: cada linha é um resultado. Só o
+    processo principal escreve, uma linha por arquivo transcrito, então
+    uma execução interrompida não perde o que já foi feito.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._results = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        self._results[self.key(record['sha256'], record['model'], record['language'])] = record
+                    except (ValueError, KeyError):
+                        continue   # linha incompleta de uma execução interrompida
+        self._file = None
+
+    @staticmethod
+    def key(sha256, model, language):
+        return f"{sha256}:{model}:{language}"
+
+    def get(self, sha256, model, language):
+        return self._results.get(self.key(sha256, model, language))
+
+    def add(self, record):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._results[self.key(record['sha256'], record['model'], record['language'])] = record
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _init_worker(model_name, threads):
+    """Carrega o modelo uma vez por processo e divide os núcleos entre os processos"""
+    global _model
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _model = whisper.load_model(model_name)
+
+
+def _transcribe(path, language):
+    started = time.perf_counter()
+    result = _model.transcribe(path, language=language)
+    return result["text"], time.perf_counter() - started
+
+
+def transcribe_batch(files, model_name="base", language="pt", workers=None, cache=None, output=sys.stdout):
+    """
+    Transcreve os arquivos e escreve um JSON por linha em `output`, na ordem
+    em que terminam. Retorna (transcritos, vindos do cache, erros).
+    """
+    workers = workers or max(1, (os.cpu_count() or 1) // 2)
+    pending = {}
+    done = cached = errors = 0
+    for path in files:
+        try:
+            sha256 = file_hash(path)
+        except OSError as e:
+            print(f"Erro ao ler '{path}': {e}", file=sys.stderr)
+            output.write(json.dumps({'file': path, 'error': str(e)}, ensure_ascii=False) + '\n')
+            errors += 1
+            continue
+        record = cache.get(sha256, model_name, language) if cache else None
+        if record is not None:
+            output.write(json.dumps(dict(record, file=path, cached=True), ensure_ascii=False) + '\n')
+            cached += 1
+        else:
+            pending.setdefault(sha256, []).append(path)   # cópias iguais são transcritas uma vez
+
+    if not pending:
+        return 0, cached, errors
+    workers = min(workers, len(pending))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    print(f"Transcrevendo {len(pending)} arquivo(s) com {workers} processo(s) "
+          f"({model_name}, {cached} do cache)...", file=sys.stderr)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_name, threads)) as pool:
+        futures = {pool.submit(_transcribe, paths[0], language): sha256 for sha256, paths in pending.items()}
+        for future in as_completed(futures):
+            sha256 = futures[future]
+            paths = pending[sha256]
+            try:
+                text, seconds = future.result()
+            except Exception as e:
+                print(f"Erro ao transcrever '{paths[0]}': {e}", file=sys.stderr)
+                for path in paths:
+                    output.write(json.dumps({'file': path, 'sha256': sha256, 'error': str(e)},
+                                            ensure_ascii=False) + '\n')
+                errors += len(paths)
+                continue
+            record = {'sha256': sha256, 'model': model_name, 'language': language,
+                      'text': text, 'seconds': round(seconds, 3)}
+            if cache:
+                cache.add(record)
+            for path in paths:
+                output.write(json.dumps(dict(record, file=path, cached=False), ensure_ascii=False) + '\n')
+            output.flush()
+            done += len(paths)
+    return done, cached, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Transcrição em lote de arquivos .wav')
+    parser.add_argument('source', help='pasta com arquivos .wav ou arquivo com um caminho por linha')
+    parser.add_argument('--model', default='base', help='modelo Whisper (tiny, base, small, medium, large)')
+    parser.add_argument('--language', default='pt')
+    parser.add_argument('--workers', type=int, help='processos em paralelo (padrão: metade dos núcleos)')
+    parser.add_argument('-o', '--output', help='arquivo NDJSON de saída (padrão: a saída padrão)')
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help=f'cache de transcrições (padrão: {DEFAULT_CACHE})')
+    parser.add_argument('--sem-cache', action='store_true', help='ignora o cache e transcreve tudo')
+    args = parser.parse_args()
+
+    files = find_audio_files(args.source)
+    if not files:
+        print(f"Nenhum arquivo .wav encontrado em '{args.source}'.", file=sys.stderr)
+        sys.exit(1)
+
+    cache = None if args.sem_cache else TranscriptionCache(args.cache)
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    started = time.perf_counter()
+    try:
+        done, cached, errors = transcribe_batch(files, args.model, args.language, args.workers, cache, output)
+    finally:
+        if cache:
+            cache.close()
+        if args.output:
+            output.close()
+    print(f"{done} transcrito(s), {cached} do cache, {errors} erro(s) "
+          f"em {time.perf_counter() - started:.1f}s.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark do comando de voz sem microfone: repete o pipeline (carregar o
+modelo, preparar o áudio, transcrever, procurar as frases) sobre um .wav
+gravado e compara tamanhos de modelo Whisper na CPU.
+
+O disparo do script não é executado (não faz sentido abrir o navegador a
+cada repetição); o tempo de matching e a frase detectada aparecem na tabela.
+
+Exemplos:
+    python benchmark.py                                  # tiny, base e small
+    python benchmark.py --models base medium --repeat 5
+    python benchmark.py --audio gravacoes\\comando.wav --save resultados.json
+
+Cada execução também vai para o log de tempos (temp/latencia.ndjson), com
+event "benchmark".
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+
+import whisper
+
+import timing
+from triggers import TRIGGERS_FILE, TriggerConfig
+
+DEFAULT_AUDIO = os.path.join('temp', 'microfone_audio.wav')
+DEFAULT_MODELS = ['tiny', 'base', 'small']
+
+
+def benchmark_model(model_name, audio_path, matcher, language='pt', repeat=3, warmup=1):
+    """Mede uma configuração de modelo; retorna o resumo como dict"""
+    with timing.command('benchmark', verbose=False, model=model_name, phase='load'):
+        started = time.perf_counter()
+        with timing.span('model_load'):
+            model = whisper.load_model(model_name, device='cpu')
+        load_seconds = time.perf_counter() - started
+
+    runs = []
+    text = ''
+    for run in range(warmup + repeat):
+        with timing.command('benchmark', verbose=False, model=model_name, run=run,
+                            warmup=run < warmup) as timeline:
+            with timing.span('audio_encode'):
+                audio = whisper.load_audio(audio_path)   # ffmpeg: decodifica e converte para 16 kHz
+            with timing.span('inference'):
+                text = model.transcribe(audio, language=language, fp16=False)["text"]
+            with timing.span('matching'):
+                found = matcher.match(text)
+            timing.annotate(audio_seconds=round(len(audio) / whisper.audio.SAMPLE_RATE, 2),
+                            trigger=found.phrase if found else None)
+        if run >= warmup:
+            runs.append(dict(timeline.spans))
+
+    audio_seconds = len(audio) / whisper.audio.SAMPLE_RATE
+    inference = [r['inference'] for r in runs]
+    del model
+    gc.collect()
+    return {
+        'model': model_name,
+        'load_seconds': load_seconds,
+        'audio_seconds': audio_seconds,
+        'encode_ms': statistics.median(r['audio_encode'] for r in runs) * 1000,
+        'inference_p50': statistics.median(inference),
+        'inference_max': max(inference),
+        'realtime_factor': statistics.median(inference) / audio_seconds if audio_seconds else None,
+        'matching_ms': statistics.median(r['matching'] for r in runs) * 1000,
+        'trigger': found.phrase if found else None,
+        'text': text.strip(),
+    }
+
+
+def print_table(results):
+    header = (f"{'modelo':<10} {'carga':>8} {'preparo':>9} {'infer p50':>10} {'infer máx':>10} "
+              f"{'RTF':>6} {'match':>8}  frase detectada")
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        rtf = f"{r['realtime_factor']:.2f}" if r['realtime_factor'] is not None else '-'
+        print(f"{r['model']:<10} {r['load_seconds']:>7.2f}s {r['encode_ms']:>7.1f}ms "
+              f"{r['inference_p50']:>9.2f}s {r['inference_max']:>9.2f}s {rtf:>6} "
+              f"{r['matching_ms']:>6.3f}ms  {r['trigger'] or '-'}")
+    print()
+    for r in results:
+        print(f"{r['model']}: {r['text']!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do pipeline de comando de voz (sem microfone)')
+    parser.add_argument('--audio', default=DEFAULT_AUDIO, help=f'arquivo de áudio (padrão: {DEFAULT_AUDIO})')
+    parser.add_argument('--models', nargs='+', default=DEFAULT_MODELS, help='modelos Whisper a comparar')
+    parser.add_argument('--language', default='pt')
+    parser.add_argument('--repeat', type=int, default=3, help='execuções medidas por modelo')
+    parser.add_argument('--warmup', type=int, default=1, help='execuções descartadas antes de medir')
+    parser.add_argument('--threads', type=int, help='threads do torch (padrão: as do torch)')
+    parser.add_argument('--frases', default=TRIGGERS_FILE, help='arquivo JSON com as frases acionadoras')
+    parser.add_argument('--save', help='salva os resultados em JSON')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.audio):
+        print(f"Arquivo de áudio '{args.audio}' não encontrado.")
+        sys.exit(1)
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    try:
+        matcher = TriggerConfig(args.frases).load().matcher
+    except (OSError, ValueError) as e:
+        print(f"Erro ao carregar as frases acionadoras de '{args.frases}': {e}")
+        sys.exit(1)
+
+    results = []
+    for model_name in args.models:
+        print(f"Medindo {model_name}...", file=sys.stderr)
+        results.append(benchmark_model(model_name, args.audio, matcher, args.language,
+                                       args.repeat, args.warmup))
+    print_table(results)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'audio': args.audio, 'repeat': args.repeat, 'results': results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\nResultados salvos em {args.save}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Servidor de transcrição: carrega o modelo Whisper uma única vez e fica
+esperando áudio por uma conexão local (127.0.0.1). O main.py envia o
+áudio e recebe o texto, então cada comando de voz custa só a inferência.
+
+A conexão é autenticada nos dois sentidos com uma chave aleatória, criada
+na primeira execução do servidor em um arquivo que só o usuário lê
+(~/.transcreve/daemon.key). As mensagens não usam pickle: cada
+requisição é um cabeçalho JSON seguido das amostras float32 em bytes.
+
+Uso:
+    python daemon.py --model base
+"""
+import argparse
+import json
+import os
+import secrets
+import threading
+import time
+from multiprocessing.connection import AuthenticationError, Client, Listener
+
+import numpy as np
+import whisper
+
+DEFAULT_ADDRESS = ('127.0.0.1', int(os.environ.get('TRANSCREVE_PORT', '50007')))
+# Chave compartilhada entre servidor e clientes (a conexão só aceita quem a conhece)
+KEY_FILE = os.environ.get('TRANSCREVE_KEYFILE',
+                          os.path.join(os.path.expanduser('~'), '.transcreve', 'daemon.key'))
+SAMPLE_RATE = 16000
+MAX_AUDIO_SECONDS = 600      # requisições maiores são recusadas
+MAX_HEADER_BYTES = 4096
+
+
+def load_authkey(path=KEY_FILE, create=False):
+    """
+    Lê a chave do arquivo; com create=True gera uma nova se ele não existir.
+    O arquivo é criado só com permissão do usuário (0600, pasta 0700); no
+    Windows vale a permissão da pasta do usuário. Retorna None sem chave.
+    """
+    try:
+        with open(path, 'rb') as f:
+            key = f.read().strip()
+        if key:
+            return key
+    except FileNotFoundError:
+        pass
+    if not create:
+        return None
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    key = secrets.token_hex(32).encode('ascii')
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    print(f"Chave do servidor de transcrição criada em {path}.")
+    return key
+
+
+class TranscriptionServer:
+    """
+    Mantém o modelo carregado e atende vários clientes; as inferências
+    são feitas uma de cada vez (o modelo não é seguro entre threads).
+
+    Cada requisição são duas mensagens: o cabeçalho JSON {'language': 'pt'}
+    e o áudio (float32 mono de 16 kHz, em bytes). A resposta é um JSON
+    {'text': ..., 'seconds': ...} ou {'error': ...}.
+    """
+
+    def __init__(self, model_name='base', language='pt', address=DEFAULT_ADDRESS, authkey=None):
+        self.model_name = model_name
+        self.language = language
+        self.address = address
+        self.authkey = authkey or load_authkey(create=True)
+        self.model = None
+        self._inference_lock = threading.Lock()
+
+    def load(self):
+        print(f"Carregando modelo Whisper ({self.model_name})...")
+        started = time.perf_counter()
+        self.model = whisper.load_model(self.model_name)
+        print(f"Modelo carregado em {time.perf_counter() - started:.1f}s.")
+
+    def transcribe(self, audio, language=None):
+        with self._inference_lock:
+            result = self.model.transcribe(audio, language=language or self.language)
+        return result["text"]
+
+    @staticmethod
+    def _read_request(conn):
+        """(áudio, idioma) da próxima requisição; ValueError se for inválida"""
+        # As duas mensagens são lidas antes de validar: com um cabeçalho
+        # inválido o áudio ainda fica consumido e a conexão segue alinhada
+        header = conn.recv_bytes(MAX_HEADER_BYTES)
+        data = conn.recv_bytes(MAX_AUDIO_SECONDS * SAMPLE_RATE * 4)
+        header = json.loads(header)
+        if not isinstance(header, dict):
+            raise ValueError('cabeçalho deve ser um objeto JSON')
+        language = header.get('language')
+        if language is not None and not isinstance(language, str):
+            raise ValueError('idioma inválido')
+        if len(data) % 4:
+            raise ValueError('áudio deve ser float32')
+        return np.frombuffer(data, dtype='<f4'), language
+
+    def handle(self, conn):
+        """Atende um cliente até ele desconectar"""
+        with conn:
+            while True:
+                try:
+                    audio, language = self._read_request(conn)
+                except (EOFError, OSError):
+                    return   # desconectou (ou mensagem maior que o limite)
+                except ValueError as e:
+                    conn.send_bytes(json.dumps({'error': f'Requisição inválida: {e}'}).encode('utf-8'))
+                    continue
+                started = time.perf_counter()
+                try:
+                    text = self.transcribe(audio, language)
+                    response = {'text': text, 'seconds': time.perf_counter() - started}
+                except Exception as e:
+                    print(f"Erro ao transcrever: {e}")
+                    response = {'error': str(e)}
+                conn.send_bytes(json.dumps(response, ensure_ascii=False).encode('utf-8'))
+
+    def serve_forever(self):
+        if self.model is None:
+            self.load()
+        with Listener(self.address, authkey=self.authkey) as listener:
+            host, port = self.address
+            print(f"Servidor de transcrição pronto em {host}:{port}. Ctrl+C para sair.")
+            while True:
+                try:
+                    conn = listener.accept()
+                except (AuthenticationError, OSError) as e:
+                    print(f"Conexão recusada: {e}")
+                    continue
+                threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+
+class TranscriptionClient:
+    """
+    Cliente do TranscriptionServer; mantém a conexão aberta entre chamadas.
+    Sem o arquivo de chave (servidor nunca iniciado) não tenta conectar.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, authkey=None):
+        self.address = address
+        self.authkey = authkey
+        self._conn = None
+
+    def available(self):
+        """True se o servidor está rodando (e já deixa a conexão aberta)"""
+        try:
+            self._connect()
+            return True
+        except (OSError, AuthenticationError):
+            return False
+
+    def _connect(self):
+        if self._conn is None:
+            authkey = self.authkey or load_authkey()
+            if authkey is None:
+                raise FileNotFoundError(f"Chave do servidor não encontrada em {KEY_FILE}")
+            self._conn = Client(self.address, authkey=authkey)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def transcribe(self, audio, language="pt"):
+        """
+        Transcreve um array float32 mono de 16 kHz.
+        Se o servidor foi reiniciado, reconecta uma vez.
+        """
+        header = json.dumps({'language': language}).encode('utf-8')
+        data = np.ascontiguousarray(audio, dtype='<f4').tobytes()
+        for attempt in range(2):
+            try:
+                self._connect()
+                self._conn.send_bytes(header)
+                self._conn.send_bytes(data)
+                response = json.loads(self._conn.recv_bytes())
+                break
+            except (EOFError, OSError):
+                self.close()
+                if attempt:
+                    raise
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+        return response['text']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor de transcrição Whisper')
+    parser.add_argument('--model', default='base', help='modelo Whisper (tiny, base, small, medium, large)')
+    parser.add_argument('--language', default='pt', help='idioma padrão das transcrições')
+    parser.add_argument('--port', type=int, default=DEFAULT_ADDRESS[1])
+    args = parser.parse_args()
+
+    server = TranscriptionServer(args.model, args.language, address=('127.0.0.1', args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nServidor encerrado.")
+
+
+if __name__ == "__main__":
+    main()
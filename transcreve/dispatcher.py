@@ -0,0 +1,141 @@
+"""
+Execução das ações dos comandos de voz sem travar a escuta.
+
+A tabela de frases -> scripts é resolvida uma vez na inicialização: cada
+caminho é verificado e o jeito de executá-lo (pela extensão) é decidido
+ali, não a cada comando. Depois, submit() só coloca a ação numa fila
+limitada; threads trabalhadoras executam e avisam quando terminam.
+
+Comandos repetidos (a mesma ação pedida de novo enquanto ainda está na
+fila, rodando, ou há poucos segundos) são ignorados, o que cobre a mesma
+frase reconhecida em trechos parciais seguidos ou dita duas vezes.
+"""
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+# Extensão -> tipo de ação
+KINDS = {'.bat': 'bat', '.py': 'py', '.exe': 'exe', '.mp3': 'media', '.mp4': 'media'}
+
+
+class Action:
+    """Um script/arquivo alvo, já validado; várias frases podem apontar para ele"""
+
+    def __init__(self, path):
+        self.path = path
+        self.kind = KINDS.get(os.path.splitext(path)[1].lower())
+        self.exists = os.path.exists(path)
+
+    @property
+    def valid(self):
+        return self.exists and self.kind is not None
+
+    def problem(self):
+        if not self.exists:
+            return f"Script '{self.path}' não encontrado."
+        if self.kind is None:
+            return f"Tipo de arquivo não suportado: {self.path}"
+        return None
+
+    def run(self):
+        """
+        Executa a ação. Scripts .py rodam até o fim (retorna o código de
+        saída); os demais são só iniciados (retorna None).
+        """
+        if self.kind == 'bat':
+            subprocess.Popen(f'start "" "{self.path}"', shell=True)
+        elif self.kind == 'py':
+            return subprocess.run([sys.executable, self.path]).returncode
+        else:   # .exe e mídia: abre com o programa associado
+            subprocess.Popen([self.path], shell=True)
+        return None
+
+
+def resolve_actions(trigger_scripts):
+    """
+    Frase -> Action, com uma Action por caminho. Avisa uma vez, na
+    inicialização, sobre caminhos inexistentes ou de tipo não suportado.
+    """
+    by_path = {}
+    actions = {}
+    for phrase, path in trigger_scripts.items():
+        action = by_path.get(path)
+        if action is None:
+            action = by_path[path] = Action(path)
+            if not action.valid:
+                print(f"Aviso: {action.problem()}")
+        actions[phrase] = action
+    return actions
+
+
+class ActionDispatcher:
+    """
+    Fila limitada de ações executadas por `workers` threads. submit() nunca
+    bloqueia: se a fila estiver cheia, o comando é descartado com aviso.
+    """
+
+    def __init__(self, actions, workers=2, max_pending=8, repeat_window=3.0):
+        self.actions = actions
+        self.repeat_window = repeat_window
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._active = set()       # caminhos na fila ou rodando
+        self._last_submit = {}     # caminho -> quando foi pedido pela última vez
+        self._workers = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def set_actions(self, actions):
+        """Troca a tabela de ações (recarga das frases); o que já está na fila segue"""
+        self.actions = actions
+
+    def submit(self, phrase):
+        """Agenda a ação da frase; retorna True se ela foi para a fila"""
+        action = self.actions.get(phrase)
+        if action is None:
+            print(f"A frase '{phrase}' não está mais configurada.")
+            return False
+        if not action.valid:
+            print(action.problem())
+            return False
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_submit.get(action.path)
+            if action.path in self._active or (last is not None and now - last < self.repeat_window):
+                print(f"Comando repetido ignorado: '{phrase}'.")
+                return False
+            try:
+                self._queue.put_nowait((phrase, action))
+            except queue.Full:
+                print(f"Muitas ações pendentes: '{phrase}' descartado.")
+                return False
+            self._active.add(action.path)
+            self._last_submit[action.path] = now
+        return True
+
+    def _work(self):
+        while True:
+            phrase, action = self._queue.get()
+            started = time.perf_counter()
+            try:
+                returncode = action.run()
+                seconds = time.perf_counter() - started
+                if returncode is None:
+                    print(f"'{phrase}': '{action.path}' iniciado.")
+                elif returncode == 0:
+                    print(f"'{phrase}': '{action.path}' concluído em {seconds:.1f}s.")
+                else:
+                    print(f"Erro ao executar o script '{action.path}': código de saída {returncode}.")
+            except OSError as e:
+                print(f"Erro ao executar o script '{action.path}': {e}")
+            finally:
+                with self._lock:
+                    self._active.discard(action.path)
+                self._queue.task_done()
+
+    def wait(self):
+        """Espera as ações na fila e em execução terminarem"""
+        self._queue.join()
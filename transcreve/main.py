@@ -1,81 +1,159 @@
-from app import record_audio, transcribe_audio, check_trigger_phrase
+from app import record_audio, save_audio, transcribe_audio
+from daemon import TranscriptionClient
+from dispatcher import ActionDispatcher, resolve_actions
+from triggers import TRIGGERS_FILE, TriggerConfig
+from vad import ContinuousListener
+import timing
+import argparse
 import os
-import subprocess
 
-def main():
-    temp_dir = 'temp'
-    audio_file = os.path.join(temp_dir, "microfone_audio.wav")
-    # Garante que a pasta temp existe
-    if not os.path.exists(temp_dir):
-        os.makedirs(temp_dir)
-    # Depuração: mostra o caminho do arquivo de áudio
-    print(f"Arquivo de áudio será salvo em: {audio_file}")
+def transcribe(audio, client):
+    """
+    Transcreve pelo servidor de transcrição (modelo já carregado) se ele
+    estiver rodando, senão carregando o modelo neste processo.
+    `audio` é um array float32 mono de 16 kHz.
+    """
+    if client.available():
+        print("Transcrevendo áudio pelo servidor de transcrição...")
+        with timing.span('inference'):
+            transcribed_text = client.transcribe(audio)
+        print("\n--- Transcrição ---")
+        print(transcribed_text)
+        print("-------------------")
+        return transcribed_text
+    print("Servidor de transcrição não encontrado (inicie com: python daemon.py).")
+    return transcribe_audio(audio)
+
+def run_trigger(transcribed_text, triggers, dispatcher):
+    """Executa o script da frase acionadora encontrada na transcrição, se houver"""
+    # Verifica se alguma frase está na transcrição (a mais longa vence)
+    with timing.span('matching'):
+        table = triggers.current()
+        found = table.matcher.match(transcribed_text)
 
-    # Dicionário de frases acionadoras e scripts correspondentes
-    # Adicione quantas frases/scripts quiser
-    trigger_scripts = {
-        # APP TAREFAS
-        "executar a tarefas": "C:\\Users\\jpger\\py_scripts\\apps\\tarefas\\start_server.bat",
-        "executar tarefas": "C:\\Users\\jpger\\py_scripts\\apps\\tarefas\\start_server.bat",
-        "iniciar tarefas": "C:\\Users\\jpger\\py_scripts\\apps\\tarefas\\start_server.bat",
-        "iniciar a tarefas": "C:\\Users\\jpger\\py_scripts\\apps\\tarefas\\start_server.bat",
-        "rodar tarefas": "C:\\Users\\jpger\\py_scripts\\apps\\tarefas\\start_server.bat",
-        "abra tarefas": "C:\\Users\\jpger\\py_scripts\\apps\\tarefas\\start_server.bat",
-        "abra  as tarefas": "C:\\Users\\jpger\\py_scripts\\apps\\tarefas\\start_server.bat",
-        "tarefas": "C:\\Users\\jpger\\py_scripts\\apps\\tarefas\\start_server.bat",
-        # NAVEGADOR WEB BRAVE
-        "web": "C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
-        "executar a web": "C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
-        "executar web": "C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
-        "iniciar web": "C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
-        "iniciar a web": "C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
-        "rodar web": "C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
-        "web": "C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
-        "abra web": "C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
-        "abra  o web": "C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
-        # INICIA MUSICA
-        "iniciar musica": "C:\\Users\\jpger\\Music\\Pink Floyd - Welcome To The Machine.mp3",
-        "musica": "C:\\Users\\jpger\\Music\\Pink Floyd - Welcome To The Machine.mp3",
-        "tocar musica": "C:\\Users\\jpger\\Music\\Pink Floyd - Welcome To The Machine.mp3",
-        "iniciar música": "C:\\Users\\jpger\\Music\\Pink Floyd - Welcome To The Machine.mp3",
-        "música": "C:\\Users\\jpger\\Music\\Pink Floyd - Welcome To The Machine.mp3",
-        "tocar música": "C:\\Users\\jpger\\Music\\Pink Floyd - Welcome To The Machine.mp3"
+    if found is not None:
+        execute_trigger(found.phrase, table, dispatcher)
+    else:
+        print(f"Nenhuma das frases acionadoras foi detectada na transcrição.")
 
-    }
-    trigger_phrases = list(trigger_scripts.keys())
+def execute_trigger(detected_phrase, table, dispatcher):
+    """
+    Agenda o script associado à frase acionadora; a execução acontece nas
+    threads do dispatcher, sem travar a gravação.
+    """
+    print(f"Frase '{detected_phrase}' detectada! Executando script '{table.scripts[detected_phrase]}'...")
+    timing.annotate(trigger=detected_phrase)
+    with timing.span('dispatch'):
+        dispatcher.submit(detected_phrase)
 
-    # Grava o áudio
-    recorded_file = record_audio(filename=audio_file)
+def early_trigger(partial_text, previous_phrase, table):
+    """
+    Decide se um trecho parcial já basta para acionar o comando. Retorna
+    (frase a executar ou None, frase vista neste trecho).
 
-    # Transcreve o áudio
-    transcribed_text = transcribe_audio(recorded_file)
+    A frase é aceita logo no primeiro trecho se veio sem correções e não é
+    o começo de uma frase mais longa; senão, só quando aparece de novo no
+    trecho seguinte (a transcrição parcial ficou estável).
+    """
+    with timing.span('matching'):
+        found = table.matcher.match(partial_text)
+    if found is None:
+        return None, None
+    if (found.distance == 0 and not found.extendable) or found.phrase == previous_phrase:
+        return found.phrase, found.phrase
+    return None, found.phrase
 
-    # Verifica se a frase específica está na transcrição
-    is_triggered, detected_phrase = check_trigger_phrase(transcribed_text, trigger_phrases)
+def listen_continuously(client, triggers, dispatcher, debug_file=None, partial_interval=None):
+    """
+    Escuta contínua: cada fala detectada pelo VAD é transcrita assim que
+    termina, sem precisar apertar Enter. Ctrl+C para sair.
+    Com `partial_interval` (segundos), a fala também é transcrita em
+    trechos enquanto a pessoa fala, e o comando é executado assim que
+    reconhecido com segurança (a transcrição final dessa fala é ignorada).
+    Com `debug_file`, a última fala também é salva nesse arquivo.
+    """
+    fired = None            # início da fala cujo comando já foi executado
+    seen = (None, None)     # (início da fala, frase vista no último trecho parcial)
+    with ContinuousListener(partial_interval=partial_interval) as listener:
+        print("Escutando... fale um comando (Ctrl+C para sair).")
+        for segment in listener.events():
+            if segment.start == fired:
+                continue
+            seconds = len(segment.audio) / listener.samplerate
+            kind = 'fala' if segment.final else 'parcial'
+            with timing.command(kind, verbose=segment.final, audio_seconds=round(seconds, 2)):
+                try:
+                    if not segment.final:
+                        print(f"\nTrecho parcial ({seconds:.1f}s).")
+                        previous = seen[1] if seen[0] == segment.start else None
+                        text = transcribe(segment.audio, client)
+                        table = triggers.current()
+                        phrase, current = early_trigger(text, previous, table)
+                        seen = (segment.start, current)
+                        if phrase is not None:
+                            fired = segment.start
+                            execute_trigger(phrase, table, dispatcher)
+                        continue
+                    print(f"\nFala detectada ({seconds:.1f}s).")
+                    if debug_file:
+                        save_audio(debug_file, segment.audio, listener.samplerate)
+                    run_trigger(transcribe(segment.audio, client), triggers, dispatcher)
+                except Exception as e:
+                    print(f"Erro ao transcrever a fala: {e}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Aciona scripts por comando de voz')
+    parser.add_argument('--continuo', action='store_true',
+                        help='escuta sem parar e transcreve cada fala ao terminar (sem Enter)')
+    parser.add_argument('--parcial', type=float, metavar='SEGUNDOS', nargs='?', const=1.0,
+                        help='com --continuo, transcreve trechos enquanto você fala (a cada SEGUNDOS, '
+                             'padrão 1) e executa o comando assim que reconhecido')
+    parser.add_argument('--frases', default=TRIGGERS_FILE,
+                        help=f'arquivo JSON com as frases acionadoras (padrão: {TRIGGERS_FILE})')
+    parser.add_argument('--salvar-audio', action='store_true',
+                        help='salva também a gravação em temp/microfone_audio.wav (depuração)')
+    args = parser.parse_args()
+
+    # Depuração: salva também o áudio gravado em temp/
+    debug_file = None
+    if args.salvar_audio:
+        debug_file = os.path.join('temp', "microfone_audio.wav")
+        print(f"Arquivo de áudio será salvo em: {debug_file}")
+
+    # Frases compiladas uma vez (e de novo só quando o arquivo muda);
+    # caminhos validados a cada carga; as ações rodam em segundo plano
+    triggers = TriggerConfig(args.frases)
+    try:
+        table = triggers.load()
+    except (OSError, ValueError) as e:
+        print(f"Erro ao carregar as frases acionadoras de '{args.frases}': {e}")
+        return
+    dispatcher = ActionDispatcher(resolve_actions(table.scripts))
+    triggers.on_reload = lambda table: dispatcher.set_actions(resolve_actions(table.scripts))
+    client = TranscriptionClient()
+    if args.continuo or args.parcial:
+        try:
+            listen_continuously(client, triggers, dispatcher, debug_file, args.parcial)
+        except KeyboardInterrupt:
+            print("\nEscuta encerrada.")
+        finally:
+            client.close()
+        return
+
+    # Tempo de cada etapa vai para temp/latencia.ndjson (veja timing.py)
+    with timing.command('comando'):
+        # Grava o áudio (fica em memória, não passa pelo disco)
+        recorded_audio = record_audio(debug_filename=debug_file)
+        if not len(recorded_audio):
+            print("Nenhum áudio gravado.")
+            return
+        timing.annotate(audio_seconds=round(len(recorded_audio) / 16000, 2))
+
+        transcribed_text = transcribe(recorded_audio, client)
+        client.close()
+        run_trigger(transcribed_text, triggers, dispatcher)
+    # Espera o script acionado (ex.: um .py) terminar antes de sair
+    dispatcher.wait()
 
-    
-    if is_triggered and detected_phrase in trigger_scripts:
-        script_para_executar = trigger_scripts[detected_phrase]
-        print(f"Frase '{detected_phrase}' detectada! Executando script '{script_para_executar}'...")
-        if os.path.exists(script_para_executar):
-            try:
-                if script_para_executar.endswith('.bat'):
-                    subprocess.Popen(f'start "" "{script_para_executar}"', shell=True)
-                elif script_para_executar.endswith('.py'):
-                    subprocess.run(["python", script_para_executar], check=True)
-                elif script_para_executar.endswith('.exe'):
-                    subprocess.Popen([script_para_executar], shell=True)
-                elif script_para_executar.endswith('.mp3') or script_para_executar.endswith('.mp4'):
-                    subprocess.Popen([script_para_executar], shell=True)
-                else:
-                    print(f"Tipo de arquivo não suportado: {script_para_executar}")
-            except subprocess.CalledProcessError as e:
-                print(f"Erro ao executar o script '{script_para_executar}': {e}")
-            except FileNotFoundError:
-                print(f"Interpretador Python não encontrado. Verifique sua instalação.")
-        else:
-            print(f"Script '{script_para_executar}' não encontrado.")
-    else:
-        print(f"Nenhuma das frases acionadoras foi detectada na transcrição.")
 if __name__ == "__main__":
     main()
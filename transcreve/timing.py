@@ -0,0 +1,105 @@
+"""
+Medição de tempo por etapa do comando de voz.
+
+Cada comando abre uma linha do tempo (command) e as etapas marcadas com
+span() dentro dela somam o seu tempo:
+
+    capture        gravação (tempo em que a pessoa está falando)
+    model_load     carregar o modelo Whisper
+    audio_encode   preparar o áudio para o Whisper (juntar blocos, ler .wav)
+    inference      transcrição (local ou pelo servidor)
+    matching       procurar as frases acionadoras
+    dispatch       disparar o script
+
+Ao final, o comando vira uma linha JSON no log (temp/latencia.ndjson, ou
+a variável TRANSCREVE_TIMING_LOG; vazia desliga). Fora de um comando,
+span() não faz nada.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+TIMING_LOG = os.environ.get('TRANSCREVE_TIMING_LOG', os.path.join('temp', 'latencia.ndjson'))
+STAGES = ('capture', 'model_load', 'audio_encode', 'inference', 'matching', 'dispatch')
+
+_current = threading.local()
+_log_lock = threading.Lock()
+
+
+class Timeline:
+    def __init__(self, kind, **fields):
+        self.kind = kind
+        self.fields = fields
+        self.spans = {}
+        self.started = time.perf_counter()
+        self.timestamp = datetime.now().isoformat(timespec='milliseconds')
+
+    def add(self, stage, seconds):
+        self.spans[stage] = self.spans.get(stage, 0.0) + seconds
+
+    def record(self):
+        return {
+            'event': self.kind,
+            'timestamp': self.timestamp,
+            'total': round(time.perf_counter() - self.started, 4),
+            'spans': {stage: round(seconds, 4) for stage, seconds in self.spans.items()},
+            **self.fields,
+        }
+
+    def summary(self):
+        ordered = [s for s in STAGES if s in self.spans] + [s for s in self.spans if s not in STAGES]
+        return ', '.join(f"{stage} {self.spans[stage]:.2f}s" for stage in ordered)
+
+
+def current():
+    """Linha do tempo do comando em andamento nesta thread, ou None"""
+    return getattr(_current, 'timeline', None)
+
+
+@contextmanager
+def command(kind='comando', log_path=None, verbose=True, **fields):
+    """Mede um comando inteiro; os campos extras vão para a linha do log"""
+    timeline = Timeline(kind, **fields)
+    previous, _current.timeline = current(), timeline
+    try:
+        yield timeline
+    finally:
+        _current.timeline = previous
+        if verbose and timeline.spans:
+            print(f"Tempos: {timeline.summary()}")
+        write(timeline.record(), TIMING_LOG if log_path is None else log_path)
+
+
+@contextmanager
+def span(stage):
+    timeline = current()
+    if timeline is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timeline.add(stage, time.perf_counter() - started)
+
+
+def annotate(**fields):
+    """Acrescenta campos à linha do comando em andamento (ex.: a frase detectada)"""
+    timeline = current()
+    if timeline is not None:
+        timeline.fields.update(fields)
+
+
+def write(record, path=TIMING_LOG):
+    if not path:
+        return
+    try:
+        with _log_lock:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    except OSError as e:
+        print(f"Erro ao gravar o log de tempos: {e}")
@@ -0,0 +1,301 @@
+"""
+Detecção das frases acionadoras na transcrição.
+
+As frases são normalizadas (minúsculas, sem acento e sem pontuação) e
+compiladas uma vez em um autômato Aho-Corasick por palavras: o texto
+transcrito é percorrido uma única vez, qualquer que seja o número de
+frases, e só casam palavras inteiras ("web" não casa dentro de "website").
+Quando várias frases aparecem, vence a mais longa, então "executar
+tarefas" tem prioridade sobre "tarefas".
+
+Com max_distance > 0, palavras transcritas que não existem nas frases são
+trocadas pela palavra mais parecida do vocabulário (distância de edição
+limitada), cobrindo erros comuns do Whisper como "tarefa" ou "múzica".
+
+As frases ficam em um arquivo JSON (triggers.json) que agrupa as
+variações sob a mesma ação:
+
+    {
+      "tolerancia": 1,
+      "acoes": [
+        {"alvo": "C:\\...\\start_server.bat", "frases": ["executar tarefas", "abra tarefas"]}
+      ]
+    }
+
+TriggerConfig recompila o autômato quando o arquivo muda, sem reiniciar
+o programa (nem o servidor de transcrição).
+"""
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from itertools import combinations
+
+# Arquivo de frases padrão (ao lado deste módulo)
+TRIGGERS_FILE = os.environ.get('TRANSCREVE_TRIGGERS',
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), 'triggers.json'))
+WORD_RE = re.compile(r'\w+')
+# Tamanho mínimo da palavra para aceitar cada distância de edição
+# (palavras curtas com um erro viram outras palavras)
+MIN_LENGTH_FOR_DISTANCE = {1: 4, 2: 8}
+
+
+def normalize(text):
+    """Lista de palavras em minúsculas, sem acentos e sem pontuação"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return WORD_RE.findall(text)
+
+
+def edit_distance(a, b, limit):
+    """Distância de Levenshtein entre a e b, ou limit + 1 se passar do limite"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _deletes(word, distance):
+    """Variações da palavra com até `distance` letras removidas"""
+    variants = {word}
+    for removed in range(1, min(distance, len(word) - 1) + 1):
+        for positions in combinations(range(len(word)), removed):
+            variants.add(''.join(c for i, c in enumerate(word) if i not in positions))
+    return variants
+
+
+class TriggerMatch:
+    __slots__ = ('phrase', 'start', 'end', 'distance', 'extendable')
+
+    def __init__(self, phrase, start, end, distance, extendable=False):
+        self.phrase = phrase        # frase acionadora original (chave do dicionário)
+        self.start = start          # posição (em palavras) no texto normalizado
+        self.end = end
+        self.distance = distance    # soma das correções aproximadas usadas
+        # True se a frase é o começo de outra mais longa ("tarefas" em
+        # "tarefas da semana"): num texto parcial, a frase longa ainda pode vir
+        self.extendable = extendable
+
+    @property
+    def length(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return f"TriggerMatch({self.phrase!r}, {self.start}, {self.end}, distance={self.distance})"
+
+
+class TriggerMatcher:
+    """
+    Autômato Aho-Corasick sobre as palavras das frases acionadoras.
+
+    Frases que ficam iguais depois de normalizadas ("abra  as tarefas" e
+    "abra as tarefas") contam como uma só; vale a primeira informada.
+    """
+
+    def __init__(self, phrases, max_distance=0):
+        self.max_distance = max_distance
+        self.phrases = []            # frase original por índice
+        self._terminal = []          # estado final de cada frase
+        self._goto = [{}]            # estado -> {palavra: estado}
+        self._fail = [0]
+        self._output = [[]]          # estado -> [(índice da frase, nº de palavras)]
+        seen = set()
+        for phrase in phrases:
+            words = tuple(normalize(phrase))
+            if not words or words in seen:
+                continue
+            seen.add(words)
+            self._terminal.append(self._add(words, len(self.phrases)))
+            self.phrases.append(phrase)
+        self._build_failure_links()
+        self.vocabulary = {word for state in self._goto for word in state}
+        self._deletes = {}
+        if max_distance:
+            for word in self.vocabulary:
+                for variant in _deletes(word, max_distance):
+                    self._deletes.setdefault(variant, []).append(word)
+        self._corrections = {}       # cache das correções já calculadas
+
+    def _add(self, words, index):
+        state = 0
+        for word in words:
+            next_state = self._goto[state].get(word)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][word] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((index, len(words)))
+        return state
+
+    def _build_failure_links(self):
+        queue = list(self._goto[0].values())
+        for state in queue:   # busca em largura; a lista cresce durante o laço
+            for word, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(word, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def _correct(self, word):
+        """(palavra do vocabulário, distância) mais próxima, ou (word, 0)"""
+        if word in self.vocabulary or not self.max_distance:
+            return word, 0
+        cached = self._corrections.get(word)
+        if cached is not None:
+            return cached
+        best = (word, 0)
+        best_distance = self.max_distance + 1
+        candidates = set()
+        for variant in _deletes(word, self.max_distance):
+            candidates.update(self._deletes.get(variant, ()))
+        for candidate in sorted(candidates):
+            limit = max((d for d, size in MIN_LENGTH_FOR_DISTANCE.items()
+                         if min(len(word), len(candidate)) >= size and d <= self.max_distance), default=0)
+            distance = edit_distance(word, candidate, limit)
+            if distance <= limit and distance < best_distance:
+                best, best_distance = (candidate, distance), distance
+        self._corrections[word] = best
+        return best
+
+    def find_all(self, text):
+        """Todas as ocorrências de frases no texto, na ordem em que terminam"""
+        matches = []
+        state = 0
+        distances = []    # distância da correção de cada palavra
+        for position, word in enumerate(normalize(text)):
+            word, distance = self._correct(word)
+            distances.append(distance)
+            while state and word not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(word, 0)
+            for index, length in self._output[state]:
+                start = position + 1 - length
+                matches.append(TriggerMatch(self.phrases[index], start, position + 1,
+                                            sum(distances[start:position + 1]),
+                                            bool(self._goto[self._terminal[index]])))
+        return matches
+
+    def match(self, text):
+        """
+        A melhor ocorrência: a frase com mais palavras; no empate, a com
+        menos correções e depois a que aparece primeiro. None se não houver.
+        """
+        matches = self.find_all(text)
+        if not matches:
+            return None
+        return min(matches, key=lambda m: (-m.length, m.distance, m.start))
+
+
+def load_trigger_config(path):
+    """
+    Lê o arquivo de frases. Retorna ({frase: alvo}, tolerância); erros de
+    formato viram ValueError com a posição do problema.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            config = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"JSON inválido em '{path}': {e}")
+    if not isinstance(config, dict) or not isinstance(config.get('acoes'), list):
+        raise ValueError(f"'{path}' deve ter uma lista 'acoes'")
+    tolerance = config.get('tolerancia', 0)
+    if not isinstance(tolerance, int) or tolerance < 0:
+        raise ValueError("'tolerancia' deve ser um inteiro >= 0")
+
+    scripts = {}
+    owners = {}   # frase normalizada -> alvo, para achar frases repetidas
+    for number, action in enumerate(config['acoes'], 1):
+        if not isinstance(action, dict) or not isinstance(action.get('alvo'), str) \
+                or not isinstance(action.get('frases'), list):
+            raise ValueError(f"Ação {number}: precisa de 'alvo' (texto) e 'frases' (lista)")
+        for phrase in action['frases']:
+            if not isinstance(phrase, str) or not normalize(phrase):
+                raise ValueError(f"Ação {number}: frase inválida {phrase!r}")
+            key = tuple(normalize(phrase))
+            if key in owners and owners[key] != action['alvo']:
+                raise ValueError(f"Ação {number}: a frase {phrase!r} já aciona '{owners[key]}'")
+            owners[key] = action['alvo']
+            scripts[phrase] = action['alvo']
+    return scripts, tolerance
+
+
+class TriggerTable:
+    """Frases -> alvos e o autômato já compilado para elas"""
+
+    def __init__(self, scripts, max_distance=0):
+        self.scripts = scripts
+        self.matcher = TriggerMatcher(scripts, max_distance)
+
+
+class TriggerConfig:
+    """
+    Arquivo de frases com recarga automática. current() confere o arquivo
+    (no máximo a cada check_interval segundos) e, se ele mudou, compila uma
+    nova tabela; on_reload(tabela) é chamado a cada carga. Se o arquivo
+    novo tiver erro, a tabela anterior continua valendo.
+    """
+
+    def __init__(self, path, check_interval=1.0, on_reload=None):
+        self.path = path
+        self.check_interval = check_interval
+        self.on_reload = on_reload
+        self.table = None
+        self._signature = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _file_signature(self):
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def load(self):
+        """Carrega o arquivo agora; erros de leitura ou formato sobem como exceção"""
+        with self._lock:
+            signature = self._file_signature()
+            scripts, tolerance = load_trigger_config(self.path)
+            self.table = TriggerTable(scripts, tolerance)
+            self._signature = signature
+            self._checked = time.monotonic()
+        if self.on_reload:
+            self.on_reload(self.table)
+        return self.table
+
+    def current(self):
+        """A tabela em vigor, recarregando o arquivo se ele mudou"""
+        if self.table is None:
+            return self.load()
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return self.table
+        self._checked = now
+        try:
+            signature = self._file_signature()
+        except OSError as e:
+            if self._signature is not None:
+                print(f"Arquivo de frases inacessível (mantendo as frases anteriores): {e}")
+                self._signature = None
+            return self.table
+        if signature == self._signature:
+            return self.table
+        try:
+            self.load()
+            print(f"Frases acionadoras recarregadas de '{self.path}' ({len(self.table.scripts)} frases).")
+        except (OSError, ValueError) as e:
+            self._signature = signature   # só avisa uma vez por versão do arquivo
+            print(f"Erro ao recarregar '{self.path}' (mantendo as frases anteriores): {e}")
+        return self.table
@@ -0,0 +1,248 @@
+"""
+Escuta contínua: o microfone fica aberto, um detector de voz por energia
+separa cada fala e os trechos vão para a transcrição assim que a fala
+termina, sem precisar apertar Enter.
+
+A memória é limitada: o áudio fica em um buffer circular de tamanho fixo
+e as filas entre as etapas têm tamanho máximo.
+
+Com partial_interval, a fala em andamento também é entregue em trechos
+parciais (janelas sobrepostas) enquanto a pessoa ainda está falando, para
+que o comando possa ser reconhecido antes do fim da fala.
+"""
+import queue
+import threading
+from collections import namedtuple
+
+import numpy as np
+import sounddevice as sd
+
+
+# start identifica a fala (posição absoluta do início); final=False para
+# os trechos parciais de uma fala ainda em andamento
+Segment = namedtuple('Segment', 'start audio final')
+
+
+class RingBuffer:
+    """
+    Buffer circular de amostras float32. As posições são absolutas (total
+    de amostras já escritas), então um trecho pode ser pedido por início e
+    fim enquanto ainda não foi sobrescrito.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self.written = 0   # posição absoluta da próxima amostra
+
+    def write(self, samples):
+        samples = samples[-self.capacity:]
+        start = self.written % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self._data[start:start + first] = samples[:first]
+        self._data[:len(samples) - first] = samples[first:]
+        self.written += len(samples)
+
+    def extract(self, start, end):
+        """Cópia das amostras [start, end); o início é cortado se já foi sobrescrito"""
+        start = max(start, self.written - self.capacity, 0)
+        end = min(end, self.written)
+        if end <= start:
+            return np.zeros(0, dtype=np.float32)
+        indexes = np.arange(start, end) % self.capacity
+        return self._data[indexes]
+
+
+class UtteranceSegmenter:
+    """
+    Detector de fala por energia (RMS em dBFS) com piso de ruído adaptativo.
+
+    Uma fala começa depois de min_speech_ms de quadros acima do piso de
+    ruído + threshold_db, e termina após hangover_ms de silêncio. O trecho
+    inclui pre_roll_ms antes do início (o começo das palavras costuma ser
+    fraco). Falas mais longas que max_utterance_s são cortadas.
+    """
+
+    def __init__(self, samplerate=16000, frame_ms=30, threshold_db=12.0, min_level_db=-50.0,
+                 min_speech_ms=90, hangover_ms=700, pre_roll_ms=300,
+                 min_utterance_ms=300, max_utterance_s=15.0):
+        self.frame_size = samplerate * frame_ms // 1000
+        self.threshold_db = threshold_db
+        self.min_level_db = min_level_db
+        self.min_speech = samplerate * min_speech_ms // 1000
+        self.hangover = samplerate * hangover_ms // 1000
+        self.pre_roll = samplerate * pre_roll_ms // 1000
+        self.min_utterance = samplerate * min_utterance_ms // 1000
+        self.max_utterance = int(samplerate * max_utterance_s)
+        self.noise_db = min_level_db - threshold_db
+        self.position = 0          # amostras já processadas
+        self._voiced_since = None  # início dos quadros de voz ainda não confirmados
+        self._start = None         # início da fala atual
+        self._last_voiced = 0
+
+    @property
+    def speech_start(self):
+        """Início da fala em andamento, ou None fora de uma fala"""
+        return self._start
+
+    @staticmethod
+    def level_db(frame):
+        rms = np.sqrt(np.mean(np.square(frame, dtype=np.float64))) if len(frame) else 0.0
+        return 20 * np.log10(max(rms, 1e-10))
+
+    def process(self, frame):
+        """
+        Processa um quadro de áudio; retorna a lista de falas concluídas
+        como (início, fim) em posições absolutas.
+        """
+        frame_start = self.position
+        self.position += len(frame)
+        level = self.level_db(frame)
+        voiced = level > max(self.noise_db + self.threshold_db, self.min_level_db)
+        finished = []
+
+        if self._start is None:
+            if voiced:
+                if self._voiced_since is None:
+                    self._voiced_since = frame_start
+                if self.position - self._voiced_since >= self.min_speech:
+                    self._start = max(0, self._voiced_since - self.pre_roll)
+                    self._last_voiced = self.position
+            else:
+                self._voiced_since = None
+                # Piso de ruído acompanha o ambiente só fora da fala
+                self.noise_db = 0.95 * self.noise_db + 0.05 * level
+            return finished
+
+        if voiced:
+            self._last_voiced = self.position
+        if self.position - self._last_voiced >= self.hangover:
+            # Duração medida do início da voz, sem o pre-roll
+            if self._last_voiced - self._voiced_since >= self.min_utterance:
+                finished.append((self._start, self.position))
+            self._start = None
+            self._voiced_since = None
+        elif self.position - self._start >= self.max_utterance:
+            finished.append((self._start, self.position))
+            self._start = self._voiced_since = self.position
+        return finished
+
+
+class ContinuousListener:
+    """
+    Mantém o microfone aberto e entrega cada fala detectada como um array
+    float32 mono (16 kHz, o formato que o Whisper espera).
+
+    O callback do sounddevice só copia o bloco para uma fila; a detecção
+    roda em outra thread. Se a transcrição atrasar, as falas mais antigas
+    pendentes são descartadas em vez de acumular memória.
+
+    Com partial_interval (segundos), a cada intervalo de fala nova é
+    entregue também um trecho parcial com os últimos partial_window
+    segundos da fala em andamento; trechos consecutivos se sobrepõem.
+    """
+
+    def __init__(self, samplerate=16000, segmenter=None, buffer_seconds=20, max_pending=4,
+                 partial_interval=None, partial_window=8.0):
+        self.samplerate = samplerate
+        self.segmenter = segmenter or UtteranceSegmenter(samplerate)
+        self.partial_interval = int(partial_interval * samplerate) if partial_interval else None
+        self.partial_window = int(partial_window * samplerate)
+        self._last_partial = None   # (início da fala, posição do último trecho parcial)
+        # O buffer precisa caber a maior fala mais o pre-roll
+        capacity = max(int(samplerate * buffer_seconds),
+                       self.segmenter.max_utterance + self.segmenter.pre_roll + self.segmenter.frame_size)
+        self.ring = RingBuffer(capacity)
+        self._blocks = queue.Queue(maxsize=int(buffer_seconds * samplerate / self.segmenter.frame_size))
+        self._utterances = queue.Queue(maxsize=max_pending)
+        self._stream = None
+        self._worker = None
+        self._running = threading.Event()
+
+    def _callback(self, indata, frames, time, status):
+        if status:
+            print(status)
+        try:
+            self._blocks.put_nowait(indata[:, 0].copy())
+        except queue.Full:
+            print("Processamento de áudio atrasado: bloco descartado.")
+
+    def _process(self):
+        while self._running.is_set():
+            try:
+                block = self._blocks.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            self.ring.write(block)
+            for start, end in self.segmenter.process(block):
+                self._publish(Segment(start, self.ring.extract(start, end), True))
+            if self.partial_interval:
+                self._publish_partial()
+
+    def _publish_partial(self):
+        start = self.segmenter.speech_start
+        if start is None:
+            return
+        position = self.segmenter.position
+        if self._last_partial is None or self._last_partial[0] != start:
+            self._last_partial = (start, start)
+        if position - self._last_partial[1] < self.partial_interval:
+            return
+        self._last_partial = (start, position)
+        audio = self.ring.extract(max(start, position - self.partial_window), position)
+        self._publish(Segment(start, audio, False))
+
+    def _publish(self, segment):
+        while True:
+            try:
+                self._utterances.put_nowait(segment)
+                return
+            except queue.Full:
+                try:
+                    self._utterances.get_nowait()
+                    print("Transcrição atrasada: fala mais antiga descartada.")
+                except queue.Empty:
+                    pass
+
+    def start(self):
+        self._running.set()
+        self._worker = threading.Thread(target=self._process, daemon=True)
+        self._worker.start()
+        self._stream = sd.InputStream(samplerate=self.samplerate, channels=1, dtype='float32',
+                                      blocksize=self.segmenter.frame_size, callback=self._callback)
+        self._stream.start()
+
+    def stop(self):
+        self._running.clear()
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def events(self):
+        """
+        Gera os Segment (parciais e finais), esperando pelo próximo. Um
+        trecho parcial que já tem outro trecho depois dele na fila é pulado:
+        o seguinte cobre o mesmo áudio e mais um pouco.
+        """
+        while self._running.is_set():
+            try:
+                segment = self._utterances.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if not segment.final and not self._utterances.empty():
+                continue
+            yield segment
+
+    def utterances(self):
+        """Gera o áudio de cada fala completa, esperando pela próxima"""
+        for segment in self.events():
+            if segment.final:
+                yield segment.audio